@@ -1,5 +1,7 @@
 # mousechat/chatwin.py
 from PyQt6 import QtCore, QtGui, QtWidgets
+from mousechat.router import AUTO_MODEL
+from mousechat.tokens import TokenCounter
 import json
 
 APP_ORG = "MouseChat"
@@ -8,6 +10,11 @@ HISTORY_KEY = "prompt_history"
 HISTORY_MAX = 50
 THEME_KEY = "theme"  # "dark" or "light"
 
+def app_settings() -> QtCore.QSettings:
+    """The app's settings; QSettings.setDefaultFormat/setPath redirect it (tests)."""
+    return QtCore.QSettings(QtCore.QSettings.defaultFormat(), QtCore.QSettings.Scope.UserScope,
+                            APP_ORG, APP_NAME)
+
 # ---------- Themes (QSS) ----------
 DARK_THEME_QSS = """
 #RootFrame {
@@ -127,6 +134,9 @@ class HistoryPlainTextEdit(QtWidgets.QPlainTextEdit):
 class ChatWin(QtWidgets.QWidget):
     sendPrompt = QtCore.pyqtSignal(str)
     modelChanged = QtCore.pyqtSignal(str)
+    tierChanged = QtCore.pyqtSignal(str)
+    tokenCountChanged = QtCore.pyqtSignal(int)
+    closed = QtCore.pyqtSignal()
 
     def __init__(self, prefill: str = ""):
         super().__init__()
@@ -137,9 +147,11 @@ class ChatWin(QtWidgets.QWidget):
             QtCore.Qt.WindowType.FramelessWindowHint
         )
         self.setAttribute(QtCore.Qt.WidgetAttribute.WA_TranslucentBackground, True)
+        # Closed windows are gone for good (the controller opens a fresh one)
+        self.setAttribute(QtCore.Qt.WidgetAttribute.WA_DeleteOnClose, True)
         self.resize(620, 420)
 
-        self.settings = QtCore.QSettings(APP_ORG, APP_NAME)
+        self.settings = app_settings()
         self._restore_geometry()
 
         # ---------- Root rounded frame ----------
@@ -159,6 +171,12 @@ class ChatWin(QtWidgets.QWidget):
         self.modelCombo.setMinimumWidth(260)
         self.modelCombo.currentTextChanged.connect(self._emit_model_changed)
 
+        # Quality tier the auto entry routes within (only shown for auto)
+        self.tierCombo = QtWidgets.QComboBox(self)
+        self.tierCombo.setToolTip("Quality tier for auto routing")
+        self.tierCombo.setVisible(False)
+        self.tierCombo.currentTextChanged.connect(self.tierChanged)
+
         self.titleLbl = QtWidgets.QLabel("", self)
         tfont = self.titleLbl.font()
         tfont.setBold(True)
@@ -183,6 +201,7 @@ class ChatWin(QtWidgets.QWidget):
         title_bar.setSpacing(8)
         title_bar.addWidget(QtWidgets.QLabel("Model:", self))
         title_bar.addWidget(self.modelCombo, 0)
+        title_bar.addWidget(self.tierCombo, 0)
         title_bar.addStretch(1)
         title_bar.addWidget(self.titleLbl)
         title_bar.addStretch(1)
@@ -196,6 +215,10 @@ class ChatWin(QtWidgets.QWidget):
         self.input.prevRequested.connect(self._history_prev)
         self.input.nextRequested.connect(self._history_next)
 
+        # Live prompt size (counted off the UI thread)
+        self.tokenCounter = TokenCounter(self.input.document(), parent=self)
+        self.tokenCounter.countChanged.connect(self.tokenCountChanged)
+
         self.output = QtWidgets.QTextEdit(self)
         self.output.setReadOnly(True)
         self.output.setPlaceholderText("Model response will appear here…")
@@ -203,9 +226,12 @@ class ChatWin(QtWidgets.QWidget):
         self.sendBtn = QtWidgets.QPushButton("Send", self)
         self.copyBtn = QtWidgets.QPushButton("Copy", self)
         self.clearBtn = QtWidgets.QPushButton("Clear input", self)
+        self.estimateLbl = QtWidgets.QLabel("", self)
+        self.estimateLbl.setToolTip("Estimated prompt tokens · input cost · expected latency")
 
         btnrow = QtWidgets.QHBoxLayout()
         btnrow.addWidget(self.sendBtn)
+        btnrow.addWidget(self.estimateLbl)
         btnrow.addStretch(1)
         btnrow.addWidget(self.copyBtn)
         btnrow.addWidget(self.clearBtn)
@@ -234,6 +260,9 @@ class ChatWin(QtWidgets.QWidget):
         self._idle_opacity = 0.88
         self._active_opacity = 1.0
         self.setWindowOpacity(self._active_opacity)
+        # One animation, retargeted: hover + enter + activate used to start three
+        self._fade_anim = QtCore.QPropertyAnimation(self, b"windowOpacity", self)
+        self._fade_anim.setEasingCurve(QtCore.QEasingCurve.Type.InOutQuad)
         self.installEventFilter(self)
         self.setAttribute(QtCore.Qt.WidgetAttribute.WA_Hover, True)
 
@@ -263,17 +292,42 @@ class ChatWin(QtWidgets.QWidget):
         idx = self.modelCombo.findText(current)
         self.modelCombo.setCurrentIndex(idx if idx >= 0 else 0)
 
+    def setTiers(self, tiers: list[str], current: str):
+        self.tierCombo.blockSignals(True)
+        self.tierCombo.clear()
+        self.tierCombo.addItems(tiers)
+        idx = self.tierCombo.findText(current)
+        self.tierCombo.setCurrentIndex(idx if idx >= 0 else 0)
+        self.tierCombo.blockSignals(False)
+
     def updateTitleWithModel(self, model: str):
         # Window title (for taskbar) & inline label
         self.setWindowTitle(model)
         self.titleLbl.setText(model)
 
+    def setCountModel(self, model: str):
+        """Count the prompt with this model's tokenizer (differs from the selection for auto)."""
+        self.tokenCounter.setModel(model)
+
+    def setEstimate(self, tokens: int, cost: float | None, latency: float | None):
+        parts = [f"{tokens:,} tokens"]
+        if cost is not None:
+            parts.append(f"~${cost:.4f}")
+        if latency is not None:
+            parts.append(f"~{latency:.1f} s")
+        self.estimateLbl.setText(" · ".join(parts))
+
     def setResponse(self, text: str):
         self.output.setPlainText(text)
         c = self.output.textCursor()
         c.movePosition(QtGui.QTextCursor.MoveOperation.Start)
         self.output.setTextCursor(c)
 
+    @QtCore.pyqtSlot(str)
+    def showResult(self, text: str):
+        self.setResponse(text)
+        self.setBusy(False)
+
     def setBusy(self, busy: bool):
         self.sendBtn.setDisabled(busy)
         if busy:
@@ -312,9 +366,11 @@ class ChatWin(QtWidgets.QWidget):
         m = 12
         toast.move(self.root.width() - toast.width() - m, self.root.height() - toast.height() - m)
         toast.show()
-        QtCore.QTimer.singleShot(900, toast.close)
+        QtCore.QTimer.singleShot(900, toast.deleteLater)
 
     def _emit_model_changed(self, m: str):
+        self.tierCombo.setVisible(m == AUTO_MODEL)
+        self.tokenCounter.setModel(m)  # before modelChanged: the controller may retarget it
         self.modelChanged.emit(m)
         self.updateTitleWithModel(m)
 
@@ -409,17 +465,23 @@ class ChatWin(QtWidgets.QWidget):
         return super().eventFilter(obj, event)
 
     def _fade_to(self, target: float, duration_ms: int = 140):
-        anim = QtCore.QPropertyAnimation(self, b"windowOpacity", self)
+        anim = self._fade_anim
+        if anim.state() == QtCore.QAbstractAnimation.State.Running:
+            if anim.endValue() == target:
+                return  # already heading there
+            anim.stop()
+        elif abs(self.windowOpacity() - target) < 0.01:
+            return  # already there; don't spin up frame timers for nothing
         anim.setDuration(duration_ms)
         anim.setStartValue(self.windowOpacity())
         anim.setEndValue(target)
-        anim.setEasingCurve(QtCore.QEasingCurve.Type.InOutQuad)
-        anim.finished.connect(anim.deleteLater)
-        anim.start(QtCore.QAbstractAnimation.DeletionPolicy.DeleteWhenStopped)
+        anim.start()
 
     # ---------- Persist geometry ----------
     def closeEvent(self, e: QtGui.QCloseEvent):
         self._save_geometry()
+        self.tokenCounter.stop()
+        self.closed.emit()
         return super().closeEvent(e)
 
     def _save_geometry(self):
@@ -0,0 +1,58 @@
+# mousechat/idle.py
+from PyQt6 import QtCore
+import ctypes
+import ctypes.util
+import gc
+import sys
+
+IDLE_TIMEOUT_MS = 5 * 60 * 1000
+
+class IdleManager(QtCore.QObject):
+    """
+    Emits wentIdle once after timeout_ms without touch().
+
+    A single single-shot timer is re-armed on activity, so once idle the
+    app has no pending timers at all until the next hotkey or request.
+    """
+    wentIdle = QtCore.pyqtSignal()
+
+    def __init__(self, timeout_ms: int = IDLE_TIMEOUT_MS, parent=None):
+        super().__init__(parent)
+        self.idle = False
+        self._timer = QtCore.QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(timeout_ms)
+        self._timer.timeout.connect(self._on_timeout)
+
+    def setTimeout(self, timeout_ms: int):
+        self._timer.setInterval(timeout_ms)
+        if self._timer.isActive():
+            self._timer.start()
+
+    @QtCore.pyqtSlot()
+    def touch(self):
+        self.idle = False
+        self._timer.start()
+
+    @QtCore.pyqtSlot()
+    def _on_timeout(self):
+        self.idle = True
+        self.wentIdle.emit()
+
+def trim_memory():
+    """Collect garbage and hand freed pages back to the OS."""
+    gc.collect()
+    try:
+        if sys.platform == "win32":
+            kernel32 = ctypes.windll.kernel32
+            kernel32.GetCurrentProcess.restype = ctypes.c_void_p
+            # (-1, -1) = trim the working set; pages fault back in on use
+            kernel32.SetProcessWorkingSetSize(
+                ctypes.c_void_p(kernel32.GetCurrentProcess()),
+                ctypes.c_size_t(-1), ctypes.c_size_t(-1),
+            )
+        elif sys.platform.startswith("linux"):
+            libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6")
+            libc.malloc_trim(0)
+    except Exception:
+        pass
@@ -0,0 +1,205 @@
+# mousechat/ipc.py
+"""
+Local IPC endpoint of the running MouseChat instance.
+
+Listens on a QLocalServer (named pipe on Windows, unix socket elsewhere),
+restricted to the current user. Clients speak newline-delimited JSON:
+
+    -> {"id": "1", "op": "ask", "prompt": "...", "model": "openai/gpt-4o"}
+    -> {"id": "2", "op": "stream", "prompt": "..."}
+    -> {"id": "2", "op": "cancel"}
+    -> {"op": "show", "prompt": "optional prefill"}
+    -> {"op": "watch_selection", "enabled": true}
+    -> {"id": "3", "op": "profile", "seconds": 10, "dir": "optional output dir"}
+
+    <- {"id": "2", "event": "chunk", "text": "..."}      (stream only)
+    <- {"id": "1", "event": "done", "text": "..."}
+    <- {"id": "1", "event": "error", "text": "..."}
+    <- {"id": "2", "event": "cancelled"}
+    <- {"id": "3", "event": "started"}                    (profile)
+
+"id" is required for ask/stream and must not be in use by another request
+still running on the same connection. "model" is optional and defaults to
+the model selected in the UI; other values must be one of the models
+offered there. Requests run through the AppController, so every client
+shares its HTTP session.
+"""
+from PyQt6 import QtCore, QtNetwork
+import getpass
+import json
+import os
+import re
+import sys
+
+def _user_tag() -> str:
+    try:
+        user = getpass.getuser()
+    except Exception:
+        user = str(os.getuid()) if hasattr(os, "getuid") else "user"
+    return re.sub(r"[^\w.-]", "_", user)
+
+# Per user: unix sockets (/tmp) and Windows pipe names are machine-wide, and
+# another user's instance must not block ours.
+SERVER_NAME = f"MouseChatDesktop-{_user_tag()}"
+
+def _encode(msg: dict) -> bytes:
+    return (json.dumps(msg) + "\n").encode("utf-8")
+
+def forward_to_running_instance(*messages: dict, timeout_ms: int = 300) -> bool:
+    """
+    Send messages to an already running instance.
+    Returns False if nobody is listening (i.e. we are the first instance).
+    """
+    sock = QtNetwork.QLocalSocket()
+    sock.connectToServer(SERVER_NAME)
+    if not sock.waitForConnected(timeout_ms):
+        return False
+    sock.write(b"".join(_encode(m) for m in messages))
+    sock.waitForBytesWritten(timeout_ms)
+    sock.disconnectFromServer()
+    return True
+
+class IpcServer(QtCore.QObject):
+    def __init__(self, controller, parent=None):
+        super().__init__(parent)
+        self.controller = controller
+        self.server = QtNetwork.QLocalServer(self)
+        if sys.platform == "win32":
+            # On unix this option makes listen() rename its socket over an
+            # existing one, stealing a live instance's name; chmod there instead.
+            self.server.setSocketOptions(QtNetwork.QLocalServer.SocketOption.UserAccessOption)
+        self.server.newConnection.connect(self._on_new_connection)
+        # socket -> {request id -> worker}
+        self._jobs: dict = {}
+
+    def listen(self) -> bool:
+        """False if the name is taken: by another instance or a stale socket."""
+        if not self.server.listen(SERVER_NAME):
+            return False
+        self._restrict_to_user()
+        return True
+
+    def take_over(self) -> bool:
+        """
+        Remove a stale socket left by a crashed instance (unix) and listen.
+        Only call after forward_to_running_instance() failed *after* listen()
+        did; a launch racing us may have started listening in between, and
+        removing its socket would leave it unreachable.
+        """
+        QtNetwork.QLocalServer.removeServer(SERVER_NAME)
+        return self.listen()
+
+    def _restrict_to_user(self):
+        if sys.platform != "win32":
+            try:
+                os.chmod(self.server.fullServerName(), 0o600)
+            except OSError:
+                pass
+
+    @QtCore.pyqtSlot()
+    def close(self):
+        for jobs in self._jobs.values():
+            for worker in jobs.values():
+                worker.cancel()
+        self._jobs.clear()
+        self.server.close()
+
+    # ---------- Connections ----------
+    def _on_new_connection(self):
+        while self.server.hasPendingConnections():
+            sock = self.server.nextPendingConnection()
+            self._jobs[sock] = {}
+            sock.readyRead.connect(lambda s=sock: self._on_ready_read(s))
+            sock.disconnected.connect(lambda s=sock: self._on_disconnected(s))
+
+    def _on_disconnected(self, sock):
+        for worker in self._jobs.pop(sock, {}).values():
+            worker.cancel()
+        sock.deleteLater()
+
+    def _on_ready_read(self, sock):
+        while sock.canReadLine():
+            line = bytes(sock.readLine()).decode("utf-8", "replace").strip()
+            if not line:
+                continue
+            try:
+                msg = json.loads(line)
+                if not isinstance(msg, dict):
+                    raise ValueError("expected a JSON object")
+            except ValueError as e:
+                self._send(sock, {"id": None, "event": "error", "text": f"Bad request: {e}"})
+                continue
+            self._dispatch(sock, msg)
+
+    def _send(self, sock, msg: dict):
+        if sock in self._jobs and sock.state() == QtNetwork.QLocalSocket.LocalSocketState.ConnectedState:
+            sock.write(_encode(msg))
+
+    # ---------- Requests ----------
+    def _dispatch(self, sock, msg: dict):
+        op = msg.get("op")
+        rid = msg.get("id")
+        if op == "show":
+            self.controller.show_chat(str(msg.get("prompt") or ""))
+        elif op == "watch_selection":
+            enabled = msg.get("enabled")
+            if not isinstance(enabled, bool):
+                self._send(sock, {"id": rid, "event": "error", "text": "\"enabled\" must be true or false"})
+                return
+            self.controller.set_watch_selection(enabled)
+        elif op in ("ask", "stream"):
+            # Replies and cancel are matched by id
+            if not isinstance(rid, (str, int)) or rid in self._jobs.get(sock, {}):
+                self._send(sock, {"id": rid, "event": "error", "text": "Missing or duplicate request id"})
+                return
+            prompt = str(msg.get("prompt") or "").strip()
+            if not prompt:
+                self._send(sock, {"id": rid, "event": "error", "text": "Empty prompt"})
+                return
+            model = msg.get("model")
+            if model is not None and model not in self.controller.models:
+                self._send(sock, {"id": rid, "event": "error", "text": f"Unknown model: {model}"})
+                return
+            self._start(sock, rid, prompt, model, op == "stream")
+        elif op == "profile":
+            out_dir = msg.get("dir") or None
+            if out_dir is not None and not isinstance(out_dir, str):
+                self._send(sock, {"id": rid, "event": "error", "text": "Bad dir"})
+                return
+            try:
+                started = self.controller.start_profile(float(msg.get("seconds") or 0) or None, out_dir)
+            except (TypeError, ValueError) as e:
+                self._send(sock, {"id": rid, "event": "error", "text": f"Bad seconds: {e}"})
+                return
+            if started:
+                self._send(sock, {"id": rid, "event": "started"})
+            else:
+                self._send(sock, {"id": rid, "event": "error", "text": "A profile is already running"})
+        elif op == "cancel":
+            worker = self._jobs.get(sock, {}).pop(rid, None)
+            if worker is None:
+                self._send(sock, {"id": rid, "event": "error", "text": f"Unknown request id: {rid}"})
+                return
+            worker.cancel()
+            self._send(sock, {"id": rid, "event": "cancelled"})
+        else:
+            self._send(sock, {"id": rid, "event": "error", "text": f"Unknown op: {op}"})
+
+    def _start(self, sock, rid, prompt: str, model, stream: bool):
+        def finish(event: str, text: str):
+            # Drop replies for requests that were cancelled meanwhile
+            if self._jobs.get(sock, {}).pop(rid, None) is not None:
+                self._send(sock, {"id": rid, "event": event, "text": text})
+
+        def chunk(text: str):
+            if rid in self._jobs.get(sock, {}):
+                self._send(sock, {"id": rid, "event": "chunk", "text": text})
+
+        worker = self.controller.submit(
+            prompt, model,
+            stream=stream,
+            on_chunk=chunk,
+            on_done=lambda ans: finish("done", ans),
+            on_error=lambda err: finish("error", err),
+        )
+        self._jobs[sock][rid] = worker
@@ -1,5 +1,6 @@
 # mousechat/llm.py
 import os
+import json
 import requests
 from dotenv import load_dotenv
 
@@ -12,26 +13,74 @@ if not OPENROUTER_KEY:
 # Pick any model supported by OpenRouter: https://openrouter.ai/docs#models
 MODEL = "openai/gpt-4o-mini"  # example: can be openai/gpt-4o-mini, anthropic/claude-3.5-sonnet, etc.
 
-def ask_llm(prompt: str) -> str:
-    """
-    Calls OpenRouter Chat Completions API and returns the model's text.
-    """
-    url = "https://openrouter.ai/api/v1/chat/completions"
-    headers = {
-        "Authorization": f"Bearer {OPENROUTER_KEY}",
-        "HTTP-Referer": "https://yourapp.example",  # optional, for analytics
-        "X-Title": "MouseChat Desktop",              # optional, for analytics
-    }
+URL = "https://openrouter.ai/api/v1/chat/completions"
+HEADERS = {
+    "Authorization": f"Bearer {OPENROUTER_KEY}",
+    "HTTP-Referer": "https://yourapp.example",  # optional, for analytics
+    "X-Title": "MouseChat Desktop",              # optional, for analytics
+}
+
+# One pooled session per process: keeps TLS connections to OpenRouter warm
+# between prompts (and between IPC clients of the running instance).
+_session = requests.Session()
+_session.headers.update(HEADERS)
+
+def release_connections():
+    """Close pooled connections (idle mode); the session reconnects on next use."""
+    _session.close()
+
+def _payload(prompt: str, model: str, stream: bool = False) -> dict:
     payload = {
-        "model": MODEL,
+        "model": model,
         "messages": [
             {"role": "user", "content": prompt}
         ]
     }
+    if stream:
+        payload["stream"] = True
+    return payload
 
-    resp = requests.post(url, headers=headers, json=payload, timeout=30)
+def ask_llm(prompt: str, model: str = MODEL) -> str:
+    """
+    Calls OpenRouter Chat Completions API and returns the model's text.
+    """
+    resp = _session.post(URL, json=_payload(prompt, model), timeout=30)
     if resp.status_code != 200:
         raise RuntimeError(f"OpenRouter API error {resp.status_code}: {resp.text}")
 
     data = resp.json()
     return data["choices"][0]["message"]["content"].strip()
+
+def stream_llm(prompt: str, model: str = MODEL):
+    """
+    Streaming variant of ask_llm: yields text deltas as they arrive (SSE).
+    Closing the generator closes the HTTP response.
+    """
+    resp = _session.post(URL, json=_payload(prompt, model, stream=True), timeout=30, stream=True)
+    try:
+        if resp.status_code != 200:
+            raise RuntimeError(f"OpenRouter API error {resp.status_code}: {resp.text}")
+        for line in resp.iter_lines(decode_unicode=True):
+            # Skip keep-alive comments (": OPENROUTER PROCESSING") and blanks
+            if not line or not line.startswith("data:"):
+                continue
+            data = line[len("data:"):].strip()
+            if data == "[DONE]":
+                break
+            try:
+                chunk = json.loads(data)
+            except ValueError:
+                continue
+            # Errors after the 200 arrive as an event: {"error": {"message": ...}}
+            error = chunk.get("error") if isinstance(chunk, dict) else None
+            if error:
+                message = error.get("message", error) if isinstance(error, dict) else error
+                raise RuntimeError(f"OpenRouter stream error: {message}")
+            try:
+                delta = chunk["choices"][0].get("delta", {}).get("content")
+            except (KeyError, IndexError, TypeError, AttributeError):
+                continue
+            if delta:
+                yield delta
+    finally:
+        resp.close()
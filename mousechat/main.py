@@ -2,19 +2,49 @@
 from PyQt6 import QtWidgets, QtCore, QtGui
 from pynput import keyboard
 from pynput.keyboard import Key, KeyCode
-from mousechat.selection import get_selected_text
-from mousechat.chatwin import open_chat, ChatWin
-from mousechat.llm import ask_llm
+from mousechat.selection import get_selected_text, release_uia
+from mousechat.chatwin import open_chat, app_settings, ChatWin
+from mousechat.overlay import show_chip_near_cursor, release_chip
+from mousechat.watcher import SelectionWatcher, UiaSelectionSource
+from mousechat.llm import ask_llm, stream_llm, release_connections
+from mousechat.ipc import IpcServer, forward_to_running_instance
+from mousechat.router import AUTO_MODEL, LatencyRouter
+from mousechat.tokens import estimate_cost
+from mousechat.idle import IdleManager, trim_memory
+from mousechat.profiler import DEFAULT_SECONDS, MAX_SECONDS, ProfileSession, label_thread, unlabel_thread
+import argparse
+import os
+import sys
 import threading
 import time
 import inspect
 
 APP_ORG = "MouseChat"
 APP_NAME = "MouseChatDesktop"
+WATCH_SELECTION_KEY = "watch_selection"  # opt-in Ask chip on new selections
+PROFILE_HOTKEY_KEY = "profile_hotkey"    # opt-in system-wide Alt+Shift+P on Windows
 
 # Hotkey: Alt+Q. If you prefer Ctrl+Q, swap to the commented line.
 HOTKEY = {Key.alt_l, KeyCode.from_char('q')}
 # HOTKEY = {Key.ctrl_l, KeyCode.from_char('q')}
+# Alt+Shift+P: record a profile of the next DEFAULT_SECONDS (for "it froze" reports)
+PROFILE_HOTKEY = {Key.alt_l, Key.shift, KeyCode.from_char('p')}
+
+# Same hotkey for RegisterHotKey on Windows (keep in sync with HOTKEY).
+# Unlike a keyboard hook it doesn't wake us on every keystroke system-wide,
+# but Windows then delivers Alt+Q to us only: other apps stop receiving it.
+# It can't tell left from right Alt; presses without WIN_HOTKEY_VK held are
+# ignored so that, like HOTKEY, only the left one opens the chat.
+MOD_ALT, MOD_CONTROL, MOD_SHIFT, MOD_NOREPEAT = 0x0001, 0x0002, 0x0004, 0x4000
+WM_HOTKEY = 0x0312
+VK_LMENU, VK_LCONTROL = 0xA4, 0xA2
+WIN_HOTKEY = (MOD_ALT, ord('Q'))
+WIN_HOTKEY_VK = VK_LMENU
+# WIN_HOTKEY, WIN_HOTKEY_VK = (MOD_CONTROL, ord('Q')), VK_LCONTROL
+# Only registered when PROFILE_HOTKEY_KEY is set: it would be taken from
+# every other app for a key almost nobody uses.
+WIN_PROFILE_HOTKEY = (MOD_ALT | MOD_SHIFT, ord('P'))
+HOTKEY_ID, PROFILE_HOTKEY_ID = 1, 2
 
 DEFAULT_MODELS = [
     "openai/chatgpt-5",  # your preferred default
@@ -36,35 +66,90 @@ def _llm_call(prompt: str, model: str) -> str:
     return ask_llm(prompt)
 
 class LLMWorker(QtCore.QObject):
+    chunk = QtCore.pyqtSignal(str)
     finished = QtCore.pyqtSignal(str)
     failed = QtCore.pyqtSignal(str)
-    def __init__(self, prompt: str, model: str):
+    cancelled = QtCore.pyqtSignal()
+    timed = QtCore.pyqtSignal(str, float, float, bool)  # model, ttft s, total s, ok
+    def __init__(self, prompt: str, model: str, stream: bool = False):
         super().__init__()
         self.prompt = prompt
         self.model = model
+        self.stream = stream
+        self._cancel = threading.Event()
+        self._t_first: float | None = None
+    def cancel(self):
+        """Thread-safe. Streams stop at the next chunk; a blocking ask just drops its reply."""
+        self._cancel.set()
+    def _run_stream(self) -> str:
+        parts = []
+        gen = stream_llm(self.prompt, self.model)
+        try:
+            for delta in gen:
+                if self._cancel.is_set():
+                    break
+                if self._t_first is None:
+                    self._t_first = time.monotonic()
+                parts.append(delta)
+                self.chunk.emit(delta)
+        finally:
+            gen.close()
+        ans = "".join(parts).strip()
+        if not ans and not self._cancel.is_set():
+            # Not a success: the router would record it as a very fast model
+            raise RuntimeError("the model returned an empty response")
+        return ans
     @QtCore.pyqtSlot()
     def run(self):
+        label_thread("llm-worker")
+        try:
+            self._run()
+        finally:
+            unlabel_thread()
+    def _run(self):
+        t0 = time.monotonic()
         try:
-            ans = _llm_call(self.prompt, self.model)
+            ans = self._run_stream() if self.stream else _llm_call(self.prompt, self.model)
+            if self._cancel.is_set():
+                self.cancelled.emit()
+                return
+            total = time.monotonic() - t0
+            ttft = self._t_first - t0 if self._t_first is not None else total
+            self.timed.emit(self.model, ttft, total, True)
             self.finished.emit(ans if ans is not None else "")
         except Exception as e:
+            if self._cancel.is_set():
+                self.cancelled.emit()
+                return
+            self.timed.emit(self.model, 0.0, 0.0, False)
             self.failed.emit(f"Error calling model: {e}")
 
 class AppController(QtCore.QObject):
     def __init__(self, app: QtWidgets.QApplication):
         super().__init__()
         self.app = app
-        self.settings = QtCore.QSettings(APP_ORG, APP_NAME)
+        self.settings = app_settings()
 
-        self.models = DEFAULT_MODELS[:]
-        self.current_model = self.settings.value("current_model", self.models[0])
+        self.models = [AUTO_MODEL] + DEFAULT_MODELS
+        self.current_model = self.settings.value("current_model", DEFAULT_MODELS[0])
         if self.current_model not in self.models:
-            self.current_model = self.models[0]
+            self.current_model = DEFAULT_MODELS[0]
+        self.router = LatencyRouter(self.settings, self.models)
 
         self.chat: ChatWin | None = None
+        # Workers are Python-owned and must outlive their thread's run()
+        self._workers: set[LLMWorker] = set()
+        self.watcher: SelectionWatcher | None = None
+        self.profile: ProfileSession | None = None
+
+        # Drop caches after a while without hotkeys/requests
+        self.idle = IdleManager(parent=self)
+        self.idle.wentIdle.connect(self._release_idle_resources)
+        self.idle.touch()
 
     @QtCore.pyqtSlot()
     def on_hotkey(self):
+        self.idle.touch()
         # Toggle the chat window
         if self.chat is not None and self.chat.isVisible():
             self.chat.close()
@@ -74,6 +159,103 @@ class AppController(QtCore.QObject):
         # let Alt release before reading selection
         QtCore.QTimer.singleShot(120, self._open_with_selection)
 
+    @QtCore.pyqtSlot(str)
+    def show_chat(self, prefill: str = ""):
+        """Open (or raise) the chat window; used when another launch forwards to us."""
+        self.idle.touch()
+        if self.chat is not None and self.chat.isVisible():
+            if prefill:
+                self.chat.input.setPlainText(prefill)
+            self.chat.raise_()
+            self.chat.activateWindow()
+            return
+        self.chat = self._open_chat_with_model(prefill)
+
+    def submit(self, prompt: str, model: str | None = None, *, stream: bool = False,
+               on_chunk=None, on_done=None, on_error=None) -> LLMWorker:
+        """
+        Run one request on a worker thread owned by the controller.
+        AUTO_MODEL is resolved by the router; worker.model is the model used.
+        Returns the worker so the caller can cancel() it.
+        """
+        self.idle.touch()
+        model = model or self.current_model
+        if model == AUTO_MODEL:
+            model = self.router.pick()
+        thread = QtCore.QThread(parent=self)
+        worker = LLMWorker(prompt, model, stream=stream)
+        worker.moveToThread(thread)
+        self._workers.add(worker)
+        thread.started.connect(worker.run)
+        worker.timed.connect(self.router.record)
+        if on_chunk is not None:
+            worker.chunk.connect(on_chunk)
+        if on_done is not None:
+            worker.finished.connect(on_done)
+        if on_error is not None:
+            worker.failed.connect(on_error)
+        worker.finished.connect(thread.quit)
+        worker.failed.connect(thread.quit)
+        worker.cancelled.connect(thread.quit)
+        thread.finished.connect(lambda: self._workers.discard(worker))
+        thread.finished.connect(thread.deleteLater)
+        thread.start()
+        return worker
+
+    @QtCore.pyqtSlot()
+    def on_profile_hotkey(self):
+        self.start_profile()
+
+    def start_profile(self, seconds: float | None = None, out_dir: str | None = None) -> bool:
+        """
+        Sample all threads for `seconds`; False if a profile is already running.
+        Raises ValueError unless 0 < seconds <= MAX_SECONDS.
+        """
+        if self.profile is not None:
+            return False
+        seconds = DEFAULT_SECONDS if seconds is None else seconds
+        if not 0 < seconds <= MAX_SECONDS:
+            raise ValueError(f"seconds must be more than 0 and at most {MAX_SECONDS:.0f}")
+        profile = ProfileSession(self.app, seconds, out_dir, parent=self)
+        profile.finished.connect(self._on_profile_finished)
+        profile.start()
+        self.profile = profile
+        return True
+
+    @QtCore.pyqtSlot(str, str)
+    def _on_profile_finished(self, path: str, error: str):
+        if self.profile is not None:
+            self.profile.deleteLater()
+            self.profile = None
+        if error:
+            print(f"MouseChat: {error}", file=sys.stderr)
+        else:
+            print(f"MouseChat: profile written to {path}", file=sys.stderr)
+
+    def enable_selection_watcher(self, source=None):
+        """Pop the Ask chip near the cursor whenever a new selection appears."""
+        if self.watcher is None:
+            self.watcher = SelectionWatcher(source or UiaSelectionSource(), parent=self)
+            self.watcher.selectionDetected.connect(self._on_selection_detected)
+            self.app.aboutToQuit.connect(self.watcher.stop)
+        self.watcher.start()
+
+    def set_watch_selection(self, enabled: bool):
+        """Turn the selection watcher on or off, and remember it for later runs."""
+        self.settings.setValue(WATCH_SELECTION_KEY, enabled)
+        if enabled:
+            self.enable_selection_watcher()
+        elif self.watcher is not None:
+            self.watcher.stop()
+
+    @QtCore.pyqtSlot(str)
+    def _on_selection_detected(self, text: str):
+        self.idle.touch()  # the chip is about to be used; clicking it opens the chat (touches again)
+        # Selecting inside our own windows is not a new question
+        if self.app.activeWindow() is not None or (self.chat is not None and self.chat.isVisible()):
+            return
+        show_chip_near_cursor(lambda: self.show_chat(text))
+
     def _open_with_selection(self):
         prefill = get_selected_text()
         self.chat = self._open_chat_with_model(prefill)
@@ -81,23 +263,24 @@ class AppController(QtCore.QObject):
     def _open_chat_with_model(self, prefill: str) -> ChatWin:
         def on_send(window: ChatWin, prompt: str):
             window.setBusy(True)
-            # worker thread for the LLM call
-            thread = QtCore.QThread(parent=window)
-            worker = LLMWorker(prompt, self.current_model)
-            worker.moveToThread(thread)
-            thread.started.connect(worker.run)
-            worker.finished.connect(lambda ans: self._finish_ok(window, thread, worker, ans))
-            worker.failed.connect(lambda err: self._finish_err(window, thread, worker, err))
-            worker.finished.connect(thread.quit)
-            worker.failed.connect(thread.quit)
-            thread.finished.connect(thread.deleteLater)
-            thread.start()
+            # Results go to the window's own slot: Qt drops the connection if
+            # the window is closed (and deleted) before the reply arrives.
+            # Streamed (though shown at once) so the router sees time-to-first-token
+            worker = self.submit(prompt, self.current_model, stream=True,
+                                 on_done=window.showResult, on_error=window.showResult)
+            if self.current_model == AUTO_MODEL:
+                window.updateTitleWithModel(f"{AUTO_MODEL} → {worker.model}")
 
         # Create & show the chat window
         w = open_chat(prefill, on_send)  # shows and returns ChatWin
         w.setModels(self.models, self.current_model)
         w.modelChanged.connect(self._on_model_changed)
+        w.setTiers(self.router.tier_names(), self.router.tier)
+        w.tierChanged.connect(self._on_tier_changed)
+        w.tokenCountChanged.connect(self._on_token_count)
+        w.closed.connect(self._on_chat_closed)
         w.updateTitleWithModel(self.current_model)
+        w.setCountModel(self._count_model())
 
         # Place near cursor
         pos = QtGui.QCursor.pos()
@@ -112,47 +295,166 @@ class AppController(QtCore.QObject):
         self.settings.setValue("current_model", model)
         if self.chat is not None:
             self.chat.updateTitleWithModel(model)
+        if model == AUTO_MODEL:
+            self.sender().setCountModel(self._count_model())
+
+    @QtCore.pyqtSlot(str)
+    def _on_tier_changed(self, tier: str):
+        self.router.set_tier(tier)
+        self.sender().setCountModel(self._count_model())
+
+    def _count_model(self) -> str:
+        """The model estimates are for: for auto, the router's current best in the tier."""
+        if self.current_model == AUTO_MODEL:
+            return self.router.best() or self.current_model
+        return self.current_model
+
+    @QtCore.pyqtSlot(int)
+    def _on_token_count(self, tokens: int):
+        window = self.sender()
+        model = self._count_model()
+        window.setEstimate(tokens, estimate_cost(model, tokens), self.router.expected_latency(model))
 
     @QtCore.pyqtSlot()
-    def _finish_ok(self, window, thread, worker, ans: str):
-        window.setResponse(ans)
-        window.setBusy(False)
+    def _on_chat_closed(self):
+        # ChatWin deletes itself on close; forget it so nothing touches a dead widget
+        if self.sender() is self.chat:
+            self.chat = None
+        self.idle.touch()
 
     @QtCore.pyqtSlot()
-    def _finish_err(self, window, thread, worker, err: str):
-        window.setResponse(err)
-        window.setBusy(False)
+    def _release_idle_resources(self):
+        if self._workers or (self.chat is not None and self.chat.isVisible()):
+            self.idle.touch()  # still on screen or answering; look again later
+            return
+        release_chip()
+        release_connections()
+        release_uia()
+        if self.watcher is not None:
+            self.watcher.release()
+        trim_memory()
 
-def start_hotkey_listener(controller: AppController):
+def _fire_hotkey(controller: AppController, slot: str = "on_hotkey"):
+    QtCore.QMetaObject.invokeMethod(
+        controller, slot, QtCore.Qt.ConnectionType.QueuedConnection
+    )
+
+def _win_hotkey_loop(controller: AppController, profile_hotkey: bool = False) -> bool:
+    """
+    Block in GetMessage until a registered hotkey is pressed. Returns False
+    if WIN_HOTKEY could not be registered (e.g. taken by another app).
+    WIN_PROFILE_HOTKEY is registered too if profile_hotkey is set.
+    """
+    import ctypes
+    from ctypes import wintypes
+    user32 = ctypes.windll.user32
+    if not user32.RegisterHotKey(None, HOTKEY_ID, WIN_HOTKEY[0] | MOD_NOREPEAT, WIN_HOTKEY[1]):
+        return False
+    if profile_hotkey:
+        # Optional; the app works without it
+        user32.RegisterHotKey(None, PROFILE_HOTKEY_ID, WIN_PROFILE_HOTKEY[0] | MOD_NOREPEAT, WIN_PROFILE_HOTKEY[1])
+    msg = wintypes.MSG()
+    try:
+        while user32.GetMessageW(ctypes.byref(msg), None, 0, 0) > 0:
+            if msg.message != WM_HOTKEY:
+                continue
+            profile = msg.wParam == PROFILE_HOTKEY_ID
+            if user32.GetAsyncKeyState(VK_LMENU if profile else WIN_HOTKEY_VK) & 0x8000:
+                _fire_hotkey(controller, "on_profile_hotkey" if profile else "on_hotkey")
+    finally:
+        user32.UnregisterHotKey(None, HOTKEY_ID)
+        user32.UnregisterHotKey(None, PROFILE_HOTKEY_ID)
+    return True
+
+def _normalize_key(k):
+    # Shift turns 'p' into 'P'
+    if isinstance(k, KeyCode) and k.char:
+        return KeyCode.from_char(k.char.lower())
+    return k
+
+def start_hotkey_listener(controller: AppController, profile_hotkey: bool = False):
+    # The keyboard hook below only observes keys, so it always has PROFILE_HOTKEY
+    if sys.platform == "win32" and _win_hotkey_loop(controller, profile_hotkey):
+        return
     combo = set()
     last_fire = 0.0
-    def fire():
-        QtCore.QMetaObject.invokeMethod(
-            controller, "on_hotkey", QtCore.Qt.ConnectionType.QueuedConnection
-        )
     def on_press(k):
         nonlocal last_fire
-        if k in HOTKEY:
+        k = _normalize_key(k)
+        if k in HOTKEY or k in PROFILE_HOTKEY:
             combo.add(k)
-            if HOTKEY.issubset(combo):
-                now = time.time()
-                if now - last_fire > 0.3:
-                    last_fire = now
-                    fire()
+            for keys, slot in ((PROFILE_HOTKEY, "on_profile_hotkey"), (HOTKEY, "on_hotkey")):
+                if keys.issubset(combo):
+                    now = time.time()
+                    if now - last_fire > 0.3:
+                        last_fire = now
+                        _fire_hotkey(controller, slot)
+                    break
     def on_release(k):
-        combo.discard(k)
-    with keyboard.Listener(on_press=on_press, on_release=on_release) as listener:
+        combo.discard(_normalize_key(k))
+    listener = keyboard.Listener(on_press=on_press, on_release=on_release)
+    listener.name = "hotkey-hook"  # callbacks run here; named for profiles
+    with listener:
         listener.join()
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m mousechat.main")
+    parser.add_argument("--watch-selection", action=argparse.BooleanOptionalAction, default=None,
+                        help="show the Ask chip whenever text is selected (remembered for later runs)")
+    parser.add_argument("--profile", type=float, nargs="?", const=DEFAULT_SECONDS, metavar="SECONDS",
+                        help="record a sampling profile and event-loop stall report "
+                             "(of the running instance, if there is one)")
+    parser.add_argument("--profile-dir", metavar="DIR", help="where to write profiles")
+    parser.add_argument("--profile-hotkey", action=argparse.BooleanOptionalAction, default=None,
+                        help="on Windows, register Alt+Shift+P system-wide to start a profile "
+                             "(remembered; applies from the next start)")
+    args = parser.parse_args()
+    if args.profile is not None and not 0 < args.profile <= MAX_SECONDS:
+        parser.error(f"--profile: SECONDS must be more than 0 and at most {MAX_SECONDS:.0f}")
+    if args.profile_dir:
+        # May be forwarded to an instance with another working directory
+        args.profile_dir = os.path.abspath(args.profile_dir)
+
     app = QtWidgets.QApplication([])
     app.setOrganizationName(APP_ORG)
     app.setApplicationName(APP_NAME)
 
+    messages = []
+    if args.watch_selection is not None:
+        app_settings().setValue(WATCH_SELECTION_KEY, args.watch_selection)
+        messages.append({"op": "watch_selection", "enabled": args.watch_selection})
+    if args.profile_hotkey is not None:
+        app_settings().setValue(PROFILE_HOTKEY_KEY, args.profile_hotkey)
+    if args.profile:
+        messages.append({"op": "profile", "seconds": args.profile, "dir": args.profile_dir})
+    if not messages and args.profile_hotkey is None:
+        messages.append({"op": "show"})
+
+    # Single instance: hand over to the running process instead of starting another
+    if forward_to_running_instance(*messages):
+        sys.exit(0)
+
     controller = AppController(app)
     controller.moveToThread(app.thread())
 
-    t_hotkey = threading.Thread(target=start_hotkey_listener, args=(controller,), daemon=True)
+    ipc_server = IpcServer(controller)
+    if not ipc_server.listen():
+        # Another launch may have won the race since we probed; hand over to it
+        if forward_to_running_instance(*messages):
+            sys.exit(0)
+        if not ipc_server.take_over():
+            print(f"MouseChat: IPC server unavailable: {ipc_server.server.errorString()}", file=sys.stderr)
+    app.aboutToQuit.connect(ipc_server.close)  # cancel in-flight client requests
+
+    if controller.settings.value(WATCH_SELECTION_KEY, False, type=bool):
+        controller.enable_selection_watcher()
+
+    if args.profile:
+        controller.start_profile(args.profile, args.profile_dir)
+
+    profile_hotkey = controller.settings.value(PROFILE_HOTKEY_KEY, False, type=bool)
+    t_hotkey = threading.Thread(target=start_hotkey_listener, args=(controller, profile_hotkey),
+                                name="hotkey-listener", daemon=True)
     t_hotkey.start()
 
     app.exec()
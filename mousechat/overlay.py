@@ -7,9 +7,12 @@ class AskChip(QtWidgets.QPushButton):
         self.setWindowFlags(
             QtCore.Qt.WindowType.FramelessWindowHint |
             QtCore.Qt.WindowType.Tool |
-            QtCore.Qt.WindowType.WindowStaysOnTopHint
+            QtCore.Qt.WindowType.WindowStaysOnTopHint |
+            # Popping up must not steal focus (or the selection) from the user's app
+            QtCore.Qt.WindowType.WindowDoesNotAcceptFocus
         )
         self.setAttribute(QtCore.Qt.WidgetAttribute.WA_TranslucentBackground)
+        self.setAttribute(QtCore.Qt.WidgetAttribute.WA_ShowWithoutActivating)
         self.setStyleSheet("""
             QPushButton {
                 border: 1px solid rgba(0,0,0,60);
@@ -20,21 +23,50 @@ class AskChip(QtWidgets.QPushButton):
             }
             QPushButton:hover { background: rgba(245,245,245,240); }
         """)
+        self._callback = None
+        # Auto-hide if ignored (one timer, restarted on every popup)
+        self._hide_timer = QtCore.QTimer(self)
+        self._hide_timer.setSingleShot(True)
+        self._hide_timer.timeout.connect(self.dismiss)
+        self.clicked.connect(self._on_clicked)
+
+    def popup(self, pos: QtCore.QPoint, callback, timeout_ms: int = 2500):
+        self._callback = callback
+        self.move(pos.x() + 12, pos.y() + 12)
+        self.show()
+        self._hide_timer.start(timeout_ms)
+
+    def dismiss(self):
+        self._hide_timer.stop()
+        self._callback = None  # don't keep the caller's closure alive
+        self.hide()
+
+    def _on_clicked(self):
+        callback = self._callback
+        self.dismiss()
+        if callback is not None:
+            callback()
+
+# Single chip reused for every popup
+_chip: AskChip | None = None
 
 def show_chip_near_cursor(callback):
+    global _chip
     app = QtWidgets.QApplication.instance()
     if app is None:
         raise RuntimeError("QApplication must exist before show_chip_near_cursor().")
 
-    chip = AskChip()
-    chip.clicked.connect(lambda: (chip.close(), callback()))
-
-    pos = QtGui.QCursor.pos()
-    chip.move(pos.x() + 12, pos.y() + 12)
-    chip.show()
-
-    # Auto-hide if ignored
-    QtCore.QTimer.singleShot(2500, chip.close)
+    if _chip is None:
+        _chip = AskChip()
+    _chip.popup(QtGui.QCursor.pos(), callback)
 
     # Ensure it paints
     app.processEvents()
+
+def release_chip():
+    """Drop the cached chip (idle mode); the next popup builds a new one."""
+    global _chip
+    if _chip is not None:
+        _chip.dismiss()
+        _chip.deleteLater()
+        _chip = None
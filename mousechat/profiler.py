@@ -0,0 +1,169 @@
+# mousechat/profiler.py
+"""
+On-demand sampling profiler.
+
+While a ProfileSession runs, a plain Python thread samples every thread's
+stack (sys._current_frames) and an application event filter, kept busy by
+a heartbeat timer, times the gaps between Qt event dispatches on the main
+thread. When it ends it writes to out_dir:
+
+    profile-<stamp>.folded       folded stacks (flamegraph.pl, inferno, speedscope)
+    profile-<stamp>-stalls.txt   event-loop stalls and the main-thread code seen during each
+"""
+from PyQt6 import QtCore
+import bisect
+import collections
+import os
+import statistics
+import sys
+import threading
+import time
+
+DEFAULT_SECONDS = 10.0
+MAX_SECONDS = 3600.0
+SAMPLE_INTERVAL_S = 0.01
+HEARTBEAT_MS = 20          # keeps the loop dispatching, so a long gap means it was blocked
+STALL_THRESHOLD_MS = 100
+
+_thread_names: dict[int, str] = {}  # ident -> label, for threads alive now
+
+def label_thread(name: str):
+    """
+    Name the calling thread in profiles (QThreads are unknown to `threading`).
+    Call when the thread starts, profiling or not: a profile started later
+    must still recognise it. Pair with unlabel_thread() when it finishes.
+    """
+    _thread_names[threading.get_ident()] = name
+
+def unlabel_thread():
+    """Forget the calling thread's label (its ident may be reused)."""
+    _thread_names.pop(threading.get_ident(), None)
+
+def default_output_dir() -> str:
+    base = QtCore.QStandardPaths.writableLocation(
+        QtCore.QStandardPaths.StandardLocation.AppLocalDataLocation
+    )
+    return os.path.join(base or os.path.expanduser("~"), "profiles")
+
+def _fold(frame) -> str:
+    parts = []
+    while frame is not None:
+        code = frame.f_code
+        parts.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ";".join(reversed(parts))
+
+class ProfileSession(QtCore.QObject):
+    finished = QtCore.pyqtSignal(str, str)  # path of the .folded file ("" on failure), error
+
+    def __init__(self, app, seconds: float = DEFAULT_SECONDS, out_dir: str | None = None,
+                 interval_s: float = SAMPLE_INTERVAL_S, stall_ms: int = STALL_THRESHOLD_MS, parent=None):
+        super().__init__(parent)
+        self.app = app
+        self.seconds = seconds
+        self.out_dir = out_dir or default_output_dir()
+        self.interval_s = interval_s
+        self.stall_ms = stall_ms
+
+        self.stacks: collections.Counter = collections.Counter()  # "thread;frames" -> samples
+        self.main_samples: list[tuple[float, str]] = []           # (t, frames) of qt-main
+        self.stalls: list[tuple[float, float]] = []                # (start t, gap s)
+        self.samples = 0
+
+        self._t0 = 0.0
+        self._last_dispatch = 0.0
+        self._running = False
+        self._stop = threading.Event()
+        self._sampler = threading.Thread(target=self._sample_loop, name="profiler", daemon=True)
+        self._heartbeat = QtCore.QTimer(self)
+        self._heartbeat.setInterval(HEARTBEAT_MS)
+        self._end = QtCore.QTimer(self)
+        self._end.setSingleShot(True)
+        self._end.timeout.connect(self.stop)
+
+    def start(self):
+        # Timers first: if they fail, nothing has been installed or started yet
+        self._end.start(int(self.seconds * 1000))
+        self._heartbeat.start()
+        self._running = True
+        self._t0 = self._last_dispatch = time.perf_counter()
+        self.app.installEventFilter(self)
+        self._sampler.start()
+
+    @QtCore.pyqtSlot()
+    def stop(self):
+        if not self._running:
+            return
+        self._running = False
+        self._end.stop()
+        self._heartbeat.stop()
+        self.app.removeEventFilter(self)
+        self._stop.set()
+        self._sampler.join()
+        try:
+            path, error = self._write(), ""
+        except OSError as e:
+            path, error = "", f"could not write profile to {self.out_dir}: {e}"
+        self.finished.emit(path, error)
+
+    # ---------- Collection ----------
+    def eventFilter(self, obj, event):
+        now = time.perf_counter()
+        gap = now - self._last_dispatch
+        if gap * 1000 >= self.stall_ms:
+            self.stalls.append((self._last_dispatch - self._t0, gap))
+        self._last_dispatch = now
+        return False
+
+    def _sample_loop(self):
+        own = threading.get_ident()
+        main = threading.main_thread().ident
+        while not self._stop.wait(self.interval_s):
+            t = time.perf_counter() - self._t0
+            names = {th.ident: th.name for th in threading.enumerate()}
+            names.update(_thread_names)
+            names[main] = "qt-main"
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = _fold(frame)
+                name = names.get(ident) or f"thread-{ident}"
+                self.stacks[f"{name};{stack}"] += 1
+                if ident == main:
+                    self.main_samples.append((t, stack))
+            self.samples += 1
+
+    # ---------- Reports ----------
+    def stall_report(self) -> str:
+        lines = [
+            f"Event-loop stalls: gaps >= {self.stall_ms} ms between Qt event dispatches",
+            f"{self.samples} samples every {self.interval_s * 1000:.0f} ms over {self.seconds:.1f} s",
+            "",
+        ]
+        if not self.stalls:
+            lines.append("No stalls.")
+            return "\n".join(lines) + "\n"
+        gaps = [g for _, g in self.stalls]
+        lines.append(f"stalls: {len(gaps)}  total: {sum(gaps) * 1000:.0f} ms  "
+                     f"median: {statistics.median(gaps) * 1000:.0f} ms  max: {max(gaps) * 1000:.0f} ms")
+        lines.append("")
+        times = [t for t, _ in self.main_samples]  # sampled in order, so already sorted
+        for start, gap in sorted(self.stalls, key=lambda s: -s[1]):
+            lines.append(f"+{start:8.3f} s  {gap * 1000:6.0f} ms")
+            lo = bisect.bisect_left(times, start)
+            hi = bisect.bisect_right(times, start + gap)
+            seen = collections.Counter(stack for _, stack in self.main_samples[lo:hi])
+            for stack, n in seen.most_common(3):
+                innermost = " <- ".join(reversed(stack.split(";")[-4:]))
+                lines.append(f"    {n:4d} samples  {innermost}")
+        return "\n".join(lines) + "\n"
+
+    def _write(self) -> str:
+        os.makedirs(self.out_dir, exist_ok=True)
+        base = os.path.join(self.out_dir, "profile-" + time.strftime("%Y%m%d-%H%M%S"))
+        with open(base + ".folded", "w", encoding="utf-8") as f:
+            for stack, n in self.stacks.most_common():
+                f.write(f"{stack} {n}\n")
+        with open(base + "-stalls.txt", "w", encoding="utf-8") as f:
+            f.write(self.stall_report())
+        return base + ".folded"
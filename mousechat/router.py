@@ -0,0 +1,118 @@
+# mousechat/router.py
+from PyQt6 import QtCore
+import json
+import random
+import time
+
+AUTO_MODEL = "auto (fastest)"
+STATS_KEY = "router_stats"   # {model: {"ttft": s, "total": s, "n": int, "ts": epoch}}
+TIERS_KEY = "router_tiers"   # {tier: [models]}, JSON; edit to customise tiers
+TIER_KEY = "router_tier"     # tier the auto entry routes within
+
+ANY_TIER = "any"
+DEFAULT_TIERS = {
+    "best": [
+        "openai/chatgpt-5",
+        "openai/gpt-4o",
+        "anthropic/claude-3.5-sonnet",
+        "google/gemini-1.5-pro",
+    ],
+    "fast": [
+        "openai/gpt-4o-mini",
+        "openai/gpt-4.1-mini",
+    ],
+}
+
+# A failed request counts as if it had hit the request timeout
+FAILURE_PENALTY_S = 30.0
+
+class LatencyRouter:
+    """
+    Picks the model with the lowest moving-average latency within a tier.
+    Models that were never measured, or not for a while, are probed with a
+    real request every so often so their numbers do not go stale.
+    """
+    def __init__(self, settings: QtCore.QSettings, models: list[str],
+                 alpha: float = 0.3, explore: float = 0.1, stale_after_s: float = 1800.0):
+        self.settings = settings
+        self.models = [m for m in models if m != AUTO_MODEL]
+        self.alpha = alpha
+        self.explore = explore
+        self.stale_after_s = stale_after_s
+        self.tiers = self._load_json(TIERS_KEY, DEFAULT_TIERS)
+        self.tier = str(self.settings.value(TIER_KEY, ANY_TIER))
+        if self.tier not in self.tier_names():
+            self.tier = ANY_TIER
+        self.stats: dict[str, dict] = {
+            m: s for m, s in self._load_json(STATS_KEY, {}).items()
+            if isinstance(s, dict) and all(isinstance(s.get(k), (int, float)) for k in ("ttft", "total", "n"))
+        }
+
+    # ---------- Tiers ----------
+    def tier_names(self) -> list[str]:
+        return [ANY_TIER] + [t for t in self.tiers if t != ANY_TIER]
+
+    def set_tier(self, tier: str):
+        self.tier = tier if tier in self.tier_names() else ANY_TIER
+        self.settings.setValue(TIER_KEY, self.tier)
+
+    def candidates(self) -> list[str]:
+        tier_models = self.tiers.get(self.tier, self.models)
+        return [m for m in tier_models if m in self.models] or self.models[:]
+
+    # ---------- Routing ----------
+    def pick(self) -> str:
+        cands = self.candidates()
+        now = time.time()
+        measured = [m for m in cands if m in self.stats]
+        stale = [m for m in cands
+                 if m not in self.stats or now - self.stats[m].get("ts", 0) > self.stale_after_s]
+        if stale and (not measured or random.random() < self.explore):
+            return random.choice(stale)
+        return self.best() or cands[0]
+
+    def best(self) -> str | None:
+        """Fastest measured model in the tier (no probing), or None."""
+        measured = [m for m in self.candidates() if m in self.stats]
+        if not measured:
+            return None
+        # The chat window shows the whole answer at once, so rank by total time
+        return min(measured, key=lambda m: (self.stats[m]["total"], self.stats[m]["ttft"]))
+
+    def expected_latency(self, model: str) -> float | None:
+        s = self.stats.get(model)
+        return s["total"] if s else None
+
+    def record(self, model: str, ttft: float, total: float, ok: bool = True):
+        if model not in self.models:
+            return
+        if not ok:
+            ttft = total = FAILURE_PENALTY_S
+        s = self.stats.get(model)
+        if s is None:
+            s = {"ttft": ttft, "total": total, "n": 0}
+        else:
+            s["ttft"] += self.alpha * (ttft - s["ttft"])
+            s["total"] += self.alpha * (total - s["total"])
+        s["n"] += 1
+        s["ts"] = time.time()
+        self.stats[model] = s
+        self._save_stats()
+
+    # ---------- Persistence ----------
+    def _load_json(self, key: str, default: dict) -> dict:
+        v = self.settings.value(key)
+        if isinstance(v, str):
+            try:
+                data = json.loads(v)
+                if isinstance(data, dict):
+                    return data
+            except Exception:
+                pass
+        return json.loads(json.dumps(default))  # deep copy
+
+    def _save_stats(self):
+        try:
+            self.settings.setValue(STATS_KEY, json.dumps(self.stats))
+        except Exception:
+            pass
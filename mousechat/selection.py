@@ -1,5 +1,7 @@
 import time
 import ctypes
+import threading
+import comtypes
 import comtypes.client
 import win32clipboard
 
@@ -41,9 +43,26 @@ def _clipboard_set(text: str):
     finally:
         win32clipboard.CloseClipboard()
 
+# Created once per thread: instantiating the UIA client is the expensive part
+# of a read, and the selection watcher reads often (on its own thread).
+_local = threading.local()
+
+def _uia_client():
+    uia = getattr(_local, "uia", None)
+    if uia is None:
+        if threading.current_thread() is not threading.main_thread():
+            # comtypes only initializes COM for the importing thread
+            comtypes.CoInitializeEx(comtypes.COINIT_MULTITHREADED)
+        uia = _local.uia = comtypes.client.CreateObject('UIAutomationClient.CUIAutomation8')
+    return uia
+
+def release_uia():
+    """Drop the calling thread's cached UIA client (idle mode)."""
+    _local.uia = None
+
 def get_selected_text_uia() -> str:
     try:
-        uia = comtypes.client.CreateObject('UIAutomationClient.CUIAutomation8')
+        uia = _uia_client()
         focused = uia.GetFocusedElement()
         if not focused:
             return ""
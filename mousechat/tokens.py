@@ -0,0 +1,286 @@
+# mousechat/tokens.py
+from PyQt6 import QtCore, QtGui, QtWidgets
+from mousechat.profiler import label_thread, unlabel_thread
+import math
+import re
+
+# Pre-tokenizer in the style of the GPT BPE split: words with their leading
+# space, short digit runs, punctuation runs, whitespace.
+_PIECE_RE = re.compile(r"'(?:[sdmt]|ll|ve|re)| ?[^\W\d_]+| ?\d{1,3}| ?[^\s\w]+|\s+")
+
+# Per model family: (chars per token for long pieces, longest piece that is
+# usually a single token). Tuned against the families' public tokenizers.
+FAMILY_PARAMS = {
+    "openai": (4.0, 8),
+    "anthropic": (3.5, 7),
+    "google": (4.0, 8),
+}
+DEFAULT_PARAMS = (3.8, 7)
+
+# USD per 1M input tokens (OpenRouter list prices; None = unknown)
+MODEL_PRICES = {
+    "openai/chatgpt-5": None,
+    "openai/gpt-4o-mini": 0.15,
+    "openai/gpt-4o": 2.50,
+    "openai/gpt-4.1-mini": 0.40,
+    "anthropic/claude-3.5-sonnet": 3.00,
+    "google/gemini-1.5-pro": 1.25,
+}
+
+def model_family(model: str) -> str:
+    return model.split("/", 1)[0] if "/" in model else "openai"
+
+def estimate_tokens(text: str, family: str = "openai") -> int:
+    if not text:
+        return 0
+    cpt, single = FAMILY_PARAMS.get(family, DEFAULT_PARAMS)
+    n = 0
+    for piece in _PIECE_RE.findall(text):
+        n += 1 if len(piece) <= single else math.ceil(len(piece) / cpt)
+    return n
+
+# Long blocks (minified JSON, logs, text pasted without newlines) are counted
+# in chunks of at least CHUNK_CHARS, cut only where no pre-token piece can
+# span the cut (see _PIECE_RE), so the chunk counts add up to the block's
+# count exactly. TokenCounter shifts chunks along with edits and re-tokenizes
+# only the ones next to an edit.
+CHUNK_CHARS = 4096
+_CUT_RE = re.compile(r"(?<=\S) (?=\S)|(?<=\w)(?=[^\s\w])|(?<=[^\W\d])(?=\d)|(?<=\d)(?=[^\W\d])")
+
+def split_chunks(text: str) -> list[str]:
+    chunks = []
+    start, n = 0, len(text)
+    while n - start > 2 * CHUNK_CHARS:
+        m = _CUT_RE.search(text, start + CHUNK_CHARS)
+        if not m:
+            break  # e.g. one huge run of letters; stays one chunk
+        chunks.append(text[start:m.start()])
+        start = m.start()
+    chunks.append(text[start:])
+    return chunks
+
+def _splice_chunks(chunks: list[tuple[int, int | None]], pos: int, removed: int, added: int):
+    """
+    Chunk list (length, count) of a block after `removed` chars at `pos` were
+    replaced by `added` chars. Chunks within two chars of the edit are merged
+    into one with count None: a cut point depends on its neighbours.
+    """
+    out, start, dirty = [], 0, -1
+    for length, count in chunks:
+        end = start + length
+        if end + 2 <= pos or start >= pos + removed + 2:
+            out.append((length, count))
+        elif dirty < 0:
+            dirty = len(out)
+            out.append((length, None))
+        else:
+            out[dirty] = (out[dirty][0] + length, None)
+        start = end
+    if dirty < 0:
+        return None
+    out[dirty] = (out[dirty][0] + added - removed, None)
+    return out
+
+def estimate_cost(model: str, tokens: int) -> float | None:
+    price = MODEL_PRICES.get(model)
+    return None if price is None else tokens * price / 1_000_000
+
+class _CountWorker(QtCore.QObject):
+    counted = QtCore.pyqtSignal(int, str, object)  # rev, family, list | dict
+
+    # Run on the worker's own thread (started/finished are emitted there)
+    @QtCore.pyqtSlot()
+    def label(self):
+        label_thread("token-counter")
+
+    @QtCore.pyqtSlot()
+    def unlabel(self):
+        unlabel_thread()
+
+    @QtCore.pyqtSlot(int, str, object)
+    def count(self, rev: int, family: str, job):
+        if isinstance(job, dict):
+            # Some blocks: block number -> block job
+            result = {n: self._count_block(b, family) for n, b in job.items()}
+        else:
+            # Full recount: a job for every block, in order
+            result = [self._count_block(b, family) for b in job]
+        self.counted.emit(rev, family, result)
+
+    def _count_block(self, job, family: str):
+        """
+        job is the block's text, or its chunks: (length, count) for the ones
+        already counted, text for the rest. Returns the count, or the chunks
+        as (length, count) for a long block.
+        """
+        chunks = []
+        for part in [job] if isinstance(job, str) else job:
+            if isinstance(part, str):
+                # One regex call per chunk: the GIL is released in between,
+                # so a multi-megabyte line never holds up the UI thread.
+                chunks.extend((len(c), estimate_tokens(c, family)) for c in split_chunks(part))
+            else:
+                chunks.append(part)
+        return chunks[0][1] if len(chunks) == 1 else chunks
+
+class TokenCounter(QtCore.QObject):
+    """
+    Debounced prompt token count for a QTextDocument, computed on a worker
+    thread. Counts are cached per text block; an edit only invalidates the
+    blocks it touched, so typing in a multi-megabyte prompt re-tokenizes a
+    line, not the document, and within a long line only the chunks next to
+    the edit (see split_chunks).
+    """
+    countChanged = QtCore.pyqtSignal(int)
+    _request = QtCore.pyqtSignal(int, str, object)
+
+    def __init__(self, doc: QtGui.QTextDocument, model: str = "", debounce_ms: int = 250, parent=None):
+        super().__init__(parent)
+        self._doc = doc
+        self._family = model_family(model)
+        n = doc.blockCount()
+        self._counts: list[int | None] = [None] * n  # per block, None = not counted yet
+        self._chunks: dict[int, list[tuple[int, int | None]]] = {}  # long blocks: their chunks
+        self._dirty: set[int] = set(range(n))
+        self._total = 0  # sum of the known counts
+        self._rev = 0    # bumped on every edit; stale results are dropped
+        self._inflight = False
+
+        self._timer = QtCore.QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(debounce_ms)
+        self._timer.timeout.connect(self._dispatch)
+
+        self._thread = QtCore.QThread(self)
+        self._worker = _CountWorker()
+        self._worker.moveToThread(self._thread)
+        self._thread.started.connect(self._worker.label)
+        self._thread.finished.connect(self._worker.unlabel)
+        self._request.connect(self._worker.count)
+        self._worker.counted.connect(self._on_counted)
+        self._thread.start()
+        QtWidgets.QApplication.instance().aboutToQuit.connect(self.stop)
+
+        doc.contentsChange.connect(self._on_contents_change)
+        self._timer.start()
+
+    @QtCore.pyqtSlot()
+    def stop(self):
+        """Stop the worker thread; call before the owner goes away."""
+        self._timer.stop()
+        self._thread.quit()
+        self._thread.wait()
+
+    def tokens(self) -> int | None:
+        """Current count, or None while edits are still being counted."""
+        if self._dirty:
+            return None
+        return self._total + max(0, len(self._counts) - 1)  # + block separators
+
+    def setModel(self, model: str):
+        family = model_family(model)
+        if family == self._family:
+            if not self._dirty:
+                self.countChanged.emit(self.tokens())
+            return
+        self._family = family
+        n = self._doc.blockCount()
+        self._counts = [None] * n
+        self._chunks = {}
+        self._dirty = set(range(n))
+        self._total = 0
+        self._rev += 1
+        self._timer.start()
+
+    # ---------- Internals ----------
+    @QtCore.pyqtSlot(int, int, int)
+    def _on_contents_change(self, pos: int, removed: int, added: int):
+        doc = self._doc
+        last = min(pos + added, doc.characterCount() - 1)
+        b0 = doc.findBlock(pos).blockNumber()
+        b1 = doc.findBlock(last).blockNumber()
+        delta = doc.blockCount() - len(self._counts)
+        old_b1 = b1 - delta  # last block of the edited range before the edit
+
+        old = self._counts[b0:old_b1 + 1]
+        self._total -= sum(c for c in old if c is not None)
+        self._counts[b0:old_b1 + 1] = [None] * (b1 - b0 + 1)
+        self._dirty = {d if d < b0 else d + delta
+                       for d in self._dirty if d < b0 or d > old_b1}
+        self._dirty.update(range(b0, b1 + 1))
+        chunks = {d if d < b0 else d + delta: c
+                  for d, c in self._chunks.items() if d < b0 or d > old_b1}
+        if b0 == b1 and delta == 0 and b0 in self._chunks:
+            # Within one long block: keep the chunks the edit didn't reach
+            offset = pos - doc.findBlockByNumber(b0).position()
+            spliced = _splice_chunks(self._chunks[b0], offset, removed, added)
+            if spliced is not None:
+                chunks[b0] = spliced
+        self._chunks = chunks
+        self._rev += 1
+        self._timer.start()
+
+    @QtCore.pyqtSlot()
+    def _dispatch(self):
+        if self._inflight or not self._dirty:
+            return
+        doc = self._doc
+        if len(self._dirty) * 2 > doc.blockCount():
+            # Walk the blocks rather than splitting toPlainText(): that also
+            # turns U+2028 (Shift+Enter) into '\n', so lines != blocks.
+            job = []
+            block = doc.begin()
+            while block.isValid():
+                job.append(self._block_job(len(job), block.text()))
+                block = block.next()
+        else:
+            job = {n: self._block_job(n, doc.findBlockByNumber(n).text()) for n in sorted(self._dirty)}
+        self._inflight = True
+        self._request.emit(self._rev, self._family, job)
+
+    def _block_job(self, n: int, text: str):
+        """Block n for the worker: its text, or its chunks with text only where dirty."""
+        chunks = self._chunks.get(n)
+        if chunks is None or sum(length for length, _ in chunks) != len(text):
+            return text
+        job, start = [], 0
+        for length, count in chunks:
+            job.append(text[start:start + length] if count is None else (length, count))
+            start += length
+        return job
+
+    def _keep(self, n: int, result) -> int:
+        """Store a worker result for block n; return its count."""
+        if isinstance(result, int):
+            self._chunks.pop(n, None)
+            return result
+        self._chunks[n] = result
+        return sum(count for _, count in result)
+
+    @QtCore.pyqtSlot(int, str, object)
+    def _on_counted(self, rev: int, family: str, result):
+        self._inflight = False
+        if rev != self._rev or family != self._family:
+            self._timer.start()  # edited meanwhile; count again once quiet
+            return
+        if isinstance(result, list):
+            if len(result) != len(self._counts):
+                # Out of step with the document; never leave the count stale
+                n = self._doc.blockCount()
+                self._counts = [None] * n
+                self._chunks = {}
+                self._dirty = set(range(n))
+                self._total = 0
+                self._timer.start()
+                return
+            self._chunks = {}
+            self._counts = [self._keep(n, r) for n, r in enumerate(result)]
+            self._total = sum(self._counts)
+            self._dirty.clear()
+        else:
+            for n, r in result.items():
+                c = self._counts[n] = self._keep(n, r)
+                self._total += c
+            self._dirty.difference_update(result)
+        if not self._dirty:
+            self.countChanged.emit(self.tokens())
@@ -0,0 +1,218 @@
+# mousechat/watcher.py
+from PyQt6 import QtCore
+import queue
+import sys
+import threading
+import time
+
+class SelectionSource:
+    """Backend the watcher reads selections from."""
+    def read(self) -> str:
+        """Called on the watcher's reader thread, never the Qt main thread."""
+        raise NotImplementedError
+
+    def release(self):
+        """Drop cached resources (idle mode); called on the reader thread."""
+        pass
+
+    def start(self, notify) -> bool:
+        """
+        Begin calling notify() (from any thread) whenever the selection may
+        have changed. Return False if there is no event source; the watcher
+        then polls instead.
+        """
+        return False
+
+    def stop(self):
+        pass
+
+EVENT_OBJECT_TEXTSELECTIONCHANGED = 0x8014
+WINEVENT_OUTOFCONTEXT, WINEVENT_SKIPOWNPROCESS = 0x0000, 0x0002
+WM_QUIT = 0x0012
+
+class UiaSelectionSource(SelectionSource):
+    """
+    UI Automation reads (no clipboard, no synthetic keys), woken by the
+    EVENT_OBJECT_TEXTSELECTIONCHANGED WinEvent. The hook is out-of-context:
+    Windows queues only that event to our thread and never waits for us,
+    unlike a low-level mouse hook that runs Python on every mouse move.
+    Apps that don't report selection changes to accessibility won't wake it.
+    """
+    def __init__(self):
+        self._thread: threading.Thread | None = None
+        self._thread_id = 0
+
+    def read(self) -> str:
+        from mousechat.selection import get_selected_text_uia
+        return get_selected_text_uia()
+
+    def release(self):
+        from mousechat.selection import release_uia
+        release_uia()
+
+    def start(self, notify) -> bool:
+        if sys.platform != "win32":
+            return False
+        ready = threading.Event()
+        hooked = []
+        self._thread = threading.Thread(target=self._hook_loop, args=(notify, ready, hooked),
+                                        name="selection-events", daemon=True)
+        self._thread.start()
+        ready.wait()
+        if not hooked:
+            self._thread = None
+        return bool(hooked)
+
+    def stop(self):
+        if self._thread is not None:
+            import ctypes
+            ctypes.windll.user32.PostThreadMessageW(self._thread_id, WM_QUIT, 0, 0)
+            self._thread = None
+
+    def _hook_loop(self, notify, ready: threading.Event, hooked: list):
+        import ctypes
+        from ctypes import wintypes
+        user32 = ctypes.windll.user32
+        WINEVENTPROC = ctypes.WINFUNCTYPE(None, wintypes.HANDLE, wintypes.DWORD, wintypes.HWND,
+                                          wintypes.LONG, wintypes.LONG, wintypes.DWORD, wintypes.DWORD)
+        user32.SetWinEventHook.restype = wintypes.HANDLE
+        user32.SetWinEventHook.argtypes = [wintypes.DWORD, wintypes.DWORD, wintypes.HMODULE, WINEVENTPROC,
+                                           wintypes.DWORD, wintypes.DWORD, wintypes.DWORD]
+        callback = WINEVENTPROC(lambda *_: notify())  # must stay referenced while hooked
+        hook = user32.SetWinEventHook(
+            EVENT_OBJECT_TEXTSELECTIONCHANGED, EVENT_OBJECT_TEXTSELECTIONCHANGED, None, callback,
+            0, 0, WINEVENT_OUTOFCONTEXT | WINEVENT_SKIPOWNPROCESS,
+        )
+        self._thread_id = ctypes.windll.kernel32.GetCurrentThreadId()
+        if hook:
+            hooked.append(hook)
+        ready.set()
+        if not hook:
+            return
+        msg = wintypes.MSG()
+        try:
+            # Out-of-context events are delivered from inside GetMessage
+            while user32.GetMessageW(ctypes.byref(msg), None, 0, 0) > 0:
+                pass
+        finally:
+            user32.UnhookWinEvent(hook)
+
+class SelectionWatcher(QtCore.QObject):
+    """
+    Emits selectionDetected(text) when a new non-empty selection appears.
+
+    Event-driven when the source supports it (one read per debounced
+    notification), polling otherwise. Either way, reads are spaced so their
+    cost stays within cpu_budget: after a read that took t seconds, the next
+    one waits at least t / cpu_budget.
+
+    Reads are cross-process calls into whatever app has focus, so they run
+    on a reader thread: a hung app stalls the watcher, not the UI.
+    """
+    selectionDetected = QtCore.pyqtSignal(str)
+    _poke = QtCore.pyqtSignal()
+    _readDone = QtCore.pyqtSignal(str, float, float)  # text, start, seconds spent
+
+    def __init__(self, source: SelectionSource, debounce_ms: int = 150, poll_ms: int = 500,
+                 cpu_budget: float = 0.01, parent=None):
+        super().__init__(parent)
+        self.source = source
+        self.debounce_ms = debounce_ms
+        self.poll_ms = poll_ms
+        self.cpu_budget = cpu_budget
+        self.mode: str | None = None  # "event" | "poll" while running
+        self._last = ""
+        self._next_allowed = 0.0
+        self._reading = False
+        self._pending = False  # a notification arrived during a read
+        self._requests: queue.Queue | None = None  # to the reader thread; None stops it
+
+        self._debounce = QtCore.QTimer(self)
+        self._debounce.setSingleShot(True)
+        self._debounce.timeout.connect(self._check)
+        self._poll = QtCore.QTimer(self)
+        self._poll.timeout.connect(self._check)
+        # Both queued: they are emitted from the source's and the reader's threads
+        self._poke.connect(self._on_poke)
+        self._readDone.connect(self._on_read_done)
+
+    def start(self):
+        if self.mode is not None:
+            return
+        # A fresh queue per run: a reader stuck in a hung app's read is
+        # abandoned and exits once that read returns.
+        self._requests = queue.Queue()
+        self._reading = self._pending = False
+        threading.Thread(target=self._read_loop, args=(self._requests,),
+                         name="selection-reader", daemon=True).start()
+        if self.source.start(self._poke.emit):
+            self.mode = "event"
+        else:
+            self.mode = "poll"
+            self._poll.start(self.poll_ms)
+
+    @QtCore.pyqtSlot()
+    def stop(self):
+        if self.mode is None:
+            return
+        self.source.stop()
+        self._debounce.stop()
+        self._poll.stop()
+        self._requests.put(None)
+        self.mode = None
+
+    def reset(self):
+        """Forget the last selection, so selecting it again pops the chip again."""
+        self._last = ""
+
+    def release(self):
+        """Let the source drop cached resources (idle mode)."""
+        if self.mode is not None:
+            self._requests.put("release")
+
+    # ---------- Internals ----------
+    def _read_loop(self, requests: queue.Queue):
+        while (op := requests.get()) is not None:
+            if op == "release":
+                self.source.release()
+                continue
+            t0 = time.monotonic()
+            try:
+                text = self.source.read() or ""
+            except Exception:
+                text = ""
+            self._readDone.emit(text, t0, time.monotonic() - t0)
+
+    @QtCore.pyqtSlot()
+    def _on_poke(self):
+        wait_ms = (self._next_allowed - time.monotonic()) * 1000
+        self._debounce.start(max(self.debounce_ms, int(wait_ms)))
+
+    @QtCore.pyqtSlot()
+    def _check(self):
+        if self._reading:
+            self._pending = True  # the previous read hasn't returned (target app busy)
+            return
+        self._reading = True
+        self._requests.put("read")
+
+    @QtCore.pyqtSlot(str, float, float)
+    def _on_read_done(self, text: str, t0: float, spent: float):
+        self._reading = False
+        gap = spent / self.cpu_budget
+        self._next_allowed = t0 + spent + gap
+        if self.mode is None:
+            return
+        if self.mode == "poll":
+            self._poll.setInterval(max(self.poll_ms, int(gap * 1000)))
+        elif self._pending:
+            self._pending = False
+            self._on_poke()
+
+        text = text.strip()
+        if not text:
+            self._last = ""
+            return
+        if text != self._last:
+            self._last = text
+            self.selectionDetected.emit(text)
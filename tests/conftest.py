@@ -0,0 +1,87 @@
+# tests/conftest.py
+"""
+Tests run on Qt's offscreen platform, with settings in a temporary
+directory. Model calls are replaced per test; mousechat.selection (Windows
+UI Automation and clipboard) is replaced by a stand-in so no other
+application is touched, and so is pynput where it can't load (no display).
+"""
+import os
+import sys
+import types
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+os.environ.setdefault("OPENROUTER_API_KEY", "tests")
+
+import pytest
+from PyQt6 import QtCore, QtWidgets
+
+def _stand_in_selection():
+    mod = types.ModuleType("mousechat.selection")
+    mod.get_selected_text = lambda: ""
+    mod.get_selected_text_uia = lambda: ""
+    mod.release_uia = lambda: None
+    sys.modules["mousechat.selection"] = mod
+
+def _stand_in_pynput():
+    try:
+        import pynput.keyboard  # noqa: F401
+        return
+    except Exception:
+        pass
+    pynput = types.ModuleType("pynput")
+    keyboard = types.ModuleType("pynput.keyboard")
+
+    class KeyCode:
+        def __init__(self, char=None):
+            self.char = char
+        @classmethod
+        def from_char(cls, char):
+            return cls(char)
+        def __eq__(self, other):
+            return isinstance(other, KeyCode) and other.char == self.char
+        def __hash__(self):
+            return hash(self.char)
+
+    keyboard.Key = types.SimpleNamespace(alt_l="alt_l", ctrl_l="ctrl_l", shift="shift")
+    keyboard.KeyCode = KeyCode
+    keyboard.Listener = None  # the hotkey listener is never started in tests
+    pynput.keyboard = keyboard
+    sys.modules["pynput"] = pynput
+    sys.modules["pynput.keyboard"] = keyboard
+
+_stand_in_selection()
+_stand_in_pynput()
+
+def _qt_message(mode, context, message):
+    # The offscreen platform warns on every raise()/propagateSizeHints()
+    if not message.startswith("This plugin does not support"):
+        sys.stderr.write(message + "\n")
+
+@pytest.fixture(scope="session")
+def qapp(tmp_path_factory):
+    QtCore.qInstallMessageHandler(_qt_message)
+    # Never read or write the user's real settings
+    QtCore.QSettings.setDefaultFormat(QtCore.QSettings.Format.IniFormat)
+    QtCore.QSettings.setPath(QtCore.QSettings.Format.IniFormat, QtCore.QSettings.Scope.UserScope,
+                             str(tmp_path_factory.mktemp("settings")))
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    yield app
+
+@pytest.fixture
+def controller(qapp):
+    """An AppController whose model calls echo the prompt back reversed."""
+    from mousechat import main
+    from mousechat.chatwin import app_settings
+    app_settings().clear()  # a fresh settings store per test
+
+    def echo_stream(prompt, model):
+        yield prompt[::-1]
+
+    saved = main._llm_call, main.stream_llm
+    main._llm_call = lambda prompt, model: prompt[::-1]
+    main.stream_llm = echo_stream
+    ctl = main.AppController(qapp)
+    yield ctl
+    if ctl.chat is not None:
+        ctl.chat.close()
+    main._llm_call, main.stream_llm = saved
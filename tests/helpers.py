@@ -0,0 +1,69 @@
+# tests/helpers.py
+import ctypes
+import os
+import sys
+import threading
+import time
+
+from PyQt6 import QtCore
+
+def rss_bytes() -> int:
+    """Current resident set size (working set on Windows) of this process."""
+    if sys.platform == "win32":
+        class _PMC(ctypes.Structure):
+            _fields_ = [
+                ("cb", ctypes.c_ulong),
+                ("PageFaultCount", ctypes.c_ulong),
+                ("PeakWorkingSetSize", ctypes.c_size_t),
+                ("WorkingSetSize", ctypes.c_size_t),
+                ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                ("PagefileUsage", ctypes.c_size_t),
+                ("PeakPagefileUsage", ctypes.c_size_t),
+            ]
+        pmc = _PMC()
+        pmc.cb = ctypes.sizeof(pmc)
+        kernel32 = ctypes.windll.kernel32
+        kernel32.GetCurrentProcess.restype = ctypes.c_void_p
+        ctypes.windll.psapi.GetProcessMemoryInfo(
+            ctypes.c_void_p(kernel32.GetCurrentProcess()), ctypes.byref(pmc), pmc.cb
+        )
+        return pmc.WorkingSetSize
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+def pump(app, until, timeout_s: float = 5.0) -> bool:
+    """Process events until until() is true; False on timeout."""
+    deadline = time.monotonic() + timeout_s
+    while time.monotonic() < deadline:
+        app.processEvents(QtCore.QEventLoop.ProcessEventsFlag.AllEvents, 20)
+        # deleteLater() is only honoured here when asked for explicitly
+        QtCore.QCoreApplication.sendPostedEvents(None, QtCore.QEvent.Type.DeferredDelete.value)
+        if until():
+            return True
+        time.sleep(0.001)
+    return False
+
+def wait(ms: int, quit_on=None):
+    """
+    Block in a real event loop (no spinning) for ms, or until quit_on fires.
+    The timeout runs on a Python thread so waiting adds no Qt timer events.
+    """
+    loop = QtCore.QEventLoop()
+    timeout = threading.Timer(ms / 1000, lambda: QtCore.QMetaObject.invokeMethod(
+        loop, "quit", QtCore.Qt.ConnectionType.QueuedConnection))
+    timeout.start()
+    if quit_on is not None:
+        quit_on.connect(loop.quit)
+    loop.exec()
+    timeout.cancel()
+    timeout.join()
+    if quit_on is not None:
+        quit_on.disconnect(loop.quit)
@@ -0,0 +1,90 @@
+# tests/test_idle.py
+"""
+Use the app (chat, send, chip, close), let it go idle, then count what
+still wakes the process. Target: no Qt timer events at all while idle.
+"""
+import time
+
+from PyQt6 import QtCore
+
+from helpers import pump, rss_bytes, wait
+
+IDLE_AFTER_MS = 500
+MEASURE_S = 3.0
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+def _context_switches() -> int | None:
+    """Voluntary + involuntary context switches of this process, all threads."""
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_nvcsw + usage.ru_nivcsw
+
+class EventCounter(QtCore.QObject):
+    def __init__(self):
+        super().__init__()
+        self.events = self.timers = 0
+
+    def eventFilter(self, obj, event):
+        self.events += 1
+        if event.type() == QtCore.QEvent.Type.Timer:
+            self.timers += 1
+        return False
+
+def test_no_timer_wakeups_once_idle(qapp, controller):
+    from mousechat.overlay import show_chip_near_cursor
+    controller.idle.setTimeout(IDLE_AFTER_MS)
+    for i in range(20):
+        controller.show_chat(f"selection {i}")
+        w = controller.chat
+        w.sendPrompt.emit(f"prompt {i}")
+        assert pump(qapp, lambda: w.sendBtn.isEnabled())
+        show_chip_near_cursor(lambda: None)
+        w.close()
+        pump(qapp, lambda: controller.chat is None and not controller._workers)
+    active_rss = rss_bytes()
+
+    if not controller.idle.idle:
+        wait(IDLE_AFTER_MS + 2000, quit_on=controller.idle.wentIdle)
+    assert controller.idle.idle
+    pump(qapp, lambda: True)  # let the released objects' deleteLater run
+    idle_rss = rss_bytes()
+
+    counter = EventCounter()
+    qapp.installEventFilter(counter)
+    ctx0, cpu0, t0 = _context_switches(), time.process_time(), time.monotonic()
+    try:
+        wait(int(MEASURE_S * 1000))
+    finally:
+        qapp.removeEventFilter(counter)
+    wall = time.monotonic() - t0
+    ctx1 = _context_switches()
+    ctx = f"{(ctx1 - ctx0) / wall:.1f}/s" if ctx0 is not None else "n/a"
+    print(f"idle: {counter.events / wall:.1f} qt events/s, {ctx} context switches, "
+          f"{(time.process_time() - cpu0) / wall * 100:.3f}% cpu, "
+          f"rss {active_rss / 2**20:.1f} -> {idle_rss / 2**20:.1f} MB")
+
+    assert controller.idle.idle
+    assert counter.timers == 0
+
+def test_a_selection_counts_as_activity(qapp, controller):
+    controller.idle.setTimeout(IDLE_AFTER_MS)
+    wait(IDLE_AFTER_MS + 2000, quit_on=controller.idle.wentIdle)
+    assert controller.idle.idle
+    controller._on_selection_detected("some text")
+    assert not controller.idle.idle
+
+def test_resources_stay_while_a_request_runs(qapp, controller, monkeypatch):
+    from mousechat import main
+    released = []
+    monkeypatch.setattr(main, "release_chip", lambda: released.append("chip"))
+    controller._workers.add(object())  # a request still in flight
+    controller._release_idle_resources()
+    assert not released and not controller.idle.idle
+    controller._workers.clear()
+    controller._release_idle_resources()
+    assert released == ["chip"]
@@ -0,0 +1,55 @@
+# tests/test_leak.py
+"""
+Open a chat, send a prompt, wait for the reply, pop the Ask chip and close
+the window, thousands of times. Qt object counts must return to the
+warm-up baseline; Python object count and RSS may only move within slack.
+"""
+import gc
+
+from PyQt6 import QtCore, QtWidgets
+
+from helpers import pump, rss_bytes
+
+CYCLES = 2000
+WARMUP = 200
+RSS_SLACK_MB = 8.0
+PY_OBJECT_SLACK = 100
+
+def _live_objects(controller) -> dict:
+    from mousechat.chatwin import ChatWin
+    widgets = QtWidgets.QApplication.allWidgets()
+    return {
+        "widgets": len(widgets),
+        "chat_windows": sum(isinstance(w, ChatWin) for w in widgets),
+        "threads": len(controller.findChildren(QtCore.QThread)),
+        "workers": len(controller._workers),
+        "py_objects": len(gc.get_objects()),
+    }
+
+def test_open_send_close_cycles_do_not_leak(qapp, controller):
+    from mousechat.overlay import show_chip_near_cursor
+
+    def cycle(i: int):
+        controller.show_chat(f"selection {i}")
+        w = controller.chat
+        w.sendPrompt.emit(f"prompt {i}")
+        assert pump(qapp, lambda: w.sendBtn.isEnabled()), f"cycle {i}: no reply from worker"
+        show_chip_near_cursor(lambda: None)
+        w.close()
+        pump(qapp, lambda: controller.chat is None and not controller._workers
+             and not controller.findChildren(QtCore.QThread))
+
+    for i in range(WARMUP):
+        cycle(i)
+    gc.collect()
+    base, base_rss = _live_objects(controller), rss_bytes()
+    for i in range(CYCLES):
+        cycle(WARMUP + i)
+    gc.collect()
+    end, end_rss = _live_objects(controller), rss_bytes()
+
+    for key in base:
+        slack = PY_OBJECT_SLACK if key == "py_objects" else 0
+        assert end[key] - base[key] <= slack, f"{key}: {base[key]} -> {end[key]}"
+    grown_mb = (end_rss - base_rss) / 2**20
+    assert grown_mb <= RSS_SLACK_MB, f"RSS grew {grown_mb:.1f} MB over {CYCLES} cycles"
@@ -0,0 +1,17 @@
+# tests/test_profiler.py
+from mousechat.profiler import ProfileSession
+
+def test_stall_report_attributes_samples_within_each_stall(qapp, tmp_path):
+    session = ProfileSession(qapp, seconds=1, out_dir=str(tmp_path))
+    session.main_samples = [(i * 0.25, "main;idle" if i < 50 else "main;slow") for i in range(100)]
+    session.samples = 100
+    session.stalls = [(12.5, 5.0), (2.5, 2.5)]
+    report = session.stall_report()
+    # Both ends of a stall are inclusive: 12.5..17.5 s holds samples 50..70
+    assert "    21 samples  slow <- main" in report
+    assert "    11 samples  idle <- main" in report
+    assert report.index("5000 ms") < report.index("2500 ms")  # longest stall first
+
+def test_no_stalls(qapp, tmp_path):
+    session = ProfileSession(qapp, seconds=1, out_dir=str(tmp_path))
+    assert session.stall_report().endswith("No stalls.\n")
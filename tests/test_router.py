@@ -0,0 +1,127 @@
+# tests/test_router.py
+import json
+import time
+
+import pytest
+
+from mousechat.router import (
+    ANY_TIER, AUTO_MODEL, FAILURE_PENALTY_S, STATS_KEY, TIER_KEY, TIERS_KEY, LatencyRouter,
+)
+
+MODELS = [AUTO_MODEL, "openai/gpt-4o-mini", "openai/gpt-4o", "anthropic/claude-3.5-sonnet"]
+TIERS = {"fast": ["openai/gpt-4o-mini"], "best": ["openai/gpt-4o", "anthropic/claude-3.5-sonnet"]}
+
+class MemorySettings:
+    """The part of QSettings the router uses, kept in a dict."""
+    def __init__(self, values: dict | None = None):
+        self.values = dict(values or {})
+
+    def value(self, key, default=None):
+        return self.values.get(key, default)
+
+    def setValue(self, key, value):
+        self.values[key] = value
+
+def make_router(settings=None, **kwargs) -> LatencyRouter:
+    settings = settings or MemorySettings({TIERS_KEY: json.dumps(TIERS)})
+    return LatencyRouter(settings, MODELS, **kwargs)
+
+def test_auto_is_not_a_candidate():
+    assert AUTO_MODEL not in make_router().candidates()
+
+def test_unknown_tier_falls_back_to_any():
+    router = make_router()
+    router.set_tier("no-such-tier")
+    assert router.tier == ANY_TIER
+    assert router.candidates() == MODELS[1:]
+
+def test_tier_without_offered_models_falls_back_to_all_models():
+    settings = MemorySettings({TIERS_KEY: json.dumps({"gone": ["vendor/retired-model"]}),
+                               TIER_KEY: "gone"})
+    router = make_router(settings)
+    assert router.tier == "gone"
+    assert router.candidates() == MODELS[1:]
+
+def test_tier_restricts_candidates():
+    router = make_router()
+    router.set_tier("best")
+    assert router.candidates() == ["openai/gpt-4o", "anthropic/claude-3.5-sonnet"]
+
+def test_unmeasured_models_are_probed():
+    router = make_router(explore=1.0)
+    router.set_tier("best")
+    assert router.pick() in router.candidates()
+    router.record("openai/gpt-4o", 0.5, 1.0)
+    assert router.pick() == "anthropic/claude-3.5-sonnet"
+
+def test_fastest_fresh_model_wins_without_exploration():
+    router = make_router(explore=0.0)
+    router.set_tier("best")
+    router.record("openai/gpt-4o", 0.5, 3.0)
+    router.record("anthropic/claude-3.5-sonnet", 0.9, 2.0)
+    assert router.best() == "anthropic/claude-3.5-sonnet"
+    assert all(router.pick() == "anthropic/claude-3.5-sonnet" for _ in range(50))
+
+def test_stale_models_are_probed():
+    router = make_router(explore=1.0, stale_after_s=60.0)
+    router.set_tier("best")
+    router.record("openai/gpt-4o", 0.5, 3.0)
+    router.record("anthropic/claude-3.5-sonnet", 0.9, 2.0)
+    router.stats["openai/gpt-4o"]["ts"] = time.time() - 120
+    assert router.pick() == "openai/gpt-4o"
+
+def test_record_is_a_moving_average():
+    router = make_router(alpha=0.5)
+    router.record("openai/gpt-4o", 1.0, 2.0)
+    router.record("openai/gpt-4o", 3.0, 4.0)
+    s = router.stats["openai/gpt-4o"]
+    assert (s["ttft"], s["total"], s["n"]) == (2.0, 3.0, 2)
+
+def test_failure_counts_as_a_timeout():
+    router = make_router(alpha=1.0)
+    router.set_tier("best")
+    router.record("openai/gpt-4o", 0.5, 1.0)
+    router.record("anthropic/claude-3.5-sonnet", 0.9, 2.0)
+    router.record("openai/gpt-4o", 0.0, 0.0, ok=False)
+    assert router.expected_latency("openai/gpt-4o") == FAILURE_PENALTY_S
+    assert router.best() == "anthropic/claude-3.5-sonnet"
+
+def test_unknown_models_are_not_recorded():
+    router = make_router()
+    router.record(AUTO_MODEL, 0.1, 0.2)
+    router.record("vendor/other", 0.1, 0.2)
+    assert router.stats == {}
+
+def test_stats_and_tier_persist():
+    settings = MemorySettings({TIERS_KEY: json.dumps(TIERS)})
+    router = make_router(settings)
+    router.set_tier("fast")
+    router.record("openai/gpt-4o-mini", 0.2, 0.8)
+    again = make_router(settings)
+    assert again.tier == "fast"
+    assert again.stats == router.stats
+
+@pytest.mark.parametrize("stored", [
+    "not json",
+    json.dumps([1, 2]),
+    json.dumps({"openai/gpt-4o": {"ttft": "fast"}, "openai/gpt-4o-mini": 3}),
+])
+def test_corrupt_stats_are_ignored(stored):
+    router = make_router(MemorySettings({STATS_KEY: stored}))
+    assert router.stats == {}
+    assert router.best() is None
+
+def test_corrupt_tiers_fall_back_to_defaults():
+    router = make_router(MemorySettings({TIERS_KEY: "{broken"}))
+    assert "fast" in router.tier_names() and "best" in router.tier_names()
+
+def test_auto_counts_tokens_for_the_routers_best_model(qapp, controller):
+    from mousechat.tokens import model_family
+    controller.router.record("anthropic/claude-3.5-sonnet", 0.2, 0.5)
+    controller.router.record("openai/gpt-4o", 0.2, 5.0)
+    controller.show_chat("some prompt")
+    w = controller.chat
+    w.modelCombo.setCurrentText(AUTO_MODEL)
+    assert w.tokenCounter._family == model_family("anthropic/claude-3.5-sonnet")
+    w.modelCombo.setCurrentText("openai/gpt-4o")
+    assert w.tokenCounter._family == "openai"
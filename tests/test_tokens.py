@@ -0,0 +1,150 @@
+# tests/test_tokens.py
+"""
+TokenCounter keeps per-block counts and splices them on every edit; after
+any sequence of edits its total must equal a recount from scratch.
+"""
+import random
+import time
+
+import pytest
+from PyQt6 import QtCore, QtGui, QtWidgets
+
+from mousechat import tokens
+from mousechat.tokens import CHUNK_CHARS, TokenCounter, estimate_tokens, split_chunks
+
+WORDS = "alpha beta\ngamma 12345 delta, epsilon!\n\n zeta  eta".split(" ")
+
+def full_recount(doc: QtGui.QTextDocument, family: str = "openai") -> int:
+    blocks = []
+    block = doc.begin()
+    while block.isValid():
+        blocks.append(block.text())
+        block = block.next()
+    return sum(estimate_tokens(t, family) for t in blocks) + len(blocks) - 1
+
+def settled(qapp, counter: TokenCounter, timeout_s: float = 10.0) -> int | None:
+    deadline = time.monotonic() + timeout_s
+    while counter.tokens() is None and time.monotonic() < deadline:
+        qapp.processEvents(QtCore.QEventLoop.ProcessEventsFlag.AllEvents, 10)
+    return counter.tokens()
+
+@pytest.fixture
+def editor(qapp):
+    ed = QtWidgets.QPlainTextEdit()
+    ed.setPlainText("\n".join(f"line {i} foo bar" for i in range(200)))
+    counter = TokenCounter(ed.document(), "openai/gpt-4o", debounce_ms=1)
+    yield ed, counter
+    counter.stop()
+
+def random_edit(rng: random.Random, doc: QtGui.QTextDocument):
+    n = doc.characterCount() - 1
+    cursor = QtGui.QTextCursor(doc)
+    a = rng.randint(0, n)
+    b = min(n, a + rng.choice([0, 0, 1, 5, 40, 300]))
+    cursor.setPosition(a)
+    cursor.setPosition(b, QtGui.QTextCursor.MoveMode.KeepAnchor)
+    cursor.insertText(" ".join(rng.choice(WORDS) for _ in range(rng.randint(0, 6))))
+
+def test_random_edits_match_full_recount(qapp, editor):
+    ed, counter = editor
+    doc = ed.document()
+    rng = random.Random(1)
+    for i in range(300):
+        random_edit(rng, doc)
+        if i % 10 == 0:
+            assert settled(qapp, counter) == full_recount(doc), f"after edit {i}"
+
+def test_undo_and_redo(qapp, editor):
+    ed, counter = editor
+    doc = ed.document()
+    before = settled(qapp, counter)
+    rng = random.Random(2)
+    for _ in range(20):
+        random_edit(rng, doc)
+    settled(qapp, counter)
+    while doc.isUndoAvailable():
+        doc.undo()
+    assert settled(qapp, counter) == before == full_recount(doc)
+    while doc.isRedoAvailable():
+        doc.redo()
+    assert settled(qapp, counter) == full_recount(doc)
+
+def test_set_plain_text_and_clear(qapp, editor):
+    ed, counter = editor
+    ed.setPlainText("one\ntwo three\n\nfour")
+    assert settled(qapp, counter) == full_recount(ed.document())
+    ed.clear()
+    assert settled(qapp, counter) == 0
+
+def test_line_separator_from_shift_enter(qapp, editor):
+    ed, counter = editor
+    ed.setPlainText("hello world")
+    settled(qapp, counter)
+    ed.moveCursor(QtGui.QTextCursor.MoveOperation.End)
+    shift_enter = QtGui.QKeyEvent(QtCore.QEvent.Type.KeyPress, QtCore.Qt.Key.Key_Return,
+                                  QtCore.Qt.KeyboardModifier.ShiftModifier, "\r")
+    QtWidgets.QApplication.sendEvent(ed, shift_enter)
+    assert " " in ed.document().firstBlock().text()
+    assert settled(qapp, counter) == full_recount(ed.document())
+    ed.insertPlainText("more")
+    assert settled(qapp, counter) == full_recount(ed.document())
+
+def test_prefill_with_line_separator(qapp):
+    ed = QtWidgets.QPlainTextEdit()
+    ed.setPlainText("a b c\nd")
+    counter = TokenCounter(ed.document(), debounce_ms=1)
+    try:
+        assert settled(qapp, counter) == full_recount(ed.document())
+    finally:
+        counter.stop()
+
+def test_model_family_change_recounts(qapp, editor):
+    ed, counter = editor
+    settled(qapp, counter)
+    counter.setModel("anthropic/claude-3.5-sonnet")
+    assert settled(qapp, counter) == full_recount(ed.document(), "anthropic")
+
+def long_line(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(["alpha", "beta", "12345,", '{"k":', "x1f3e9a"]) for _ in range(words))
+
+def test_chunk_counts_add_up():
+    rng = random.Random(3)
+    for _ in range(20):
+        text = long_line(rng, rng.randint(1, 8 * CHUNK_CHARS // 5))
+        chunks = split_chunks(text)
+        assert "".join(chunks) == text
+        for family in ("openai", "anthropic"):
+            assert sum(estimate_tokens(c, family) for c in chunks) == estimate_tokens(text, family)
+
+def test_edits_in_one_long_line(qapp):
+    rng = random.Random(4)
+    text = long_line(rng, 100_000)
+    ed = QtWidgets.QPlainTextEdit()
+    ed.setPlainText(text)
+    counter = TokenCounter(ed.document(), debounce_ms=1)
+    try:
+        assert settled(qapp, counter) == full_recount(ed.document())
+        for _ in range(10):
+            random_edit(rng, ed.document())
+            assert settled(qapp, counter) == full_recount(ed.document())
+    finally:
+        counter.stop()
+
+def test_an_edit_in_a_long_line_retokenizes_only_nearby_chunks(qapp, monkeypatch):
+    ed = QtWidgets.QPlainTextEdit()
+    ed.setPlainText(long_line(random.Random(5), 100_000))
+    counter = TokenCounter(ed.document(), debounce_ms=1)
+    try:
+        settled(qapp, counter)
+        tokenized = []
+        def spy(text, family="openai"):
+            tokenized.append(len(text))
+            return estimate_tokens(text, family)
+        monkeypatch.setattr(tokens, "estimate_tokens", spy)
+        cursor = QtGui.QTextCursor(ed.document())
+        cursor.setPosition(len(ed.toPlainText()) // 2)
+        cursor.insertText("inserted words ")
+        assert settled(qapp, counter) == full_recount(ed.document())
+        assert 0 < sum(tokenized) <= 6 * CHUNK_CHARS
+    finally:
+        counter.stop()
@@ -0,0 +1,81 @@
+# tests/test_watcher.py
+"""
+For the event-driven and the polling watcher: CPU use and reads per second
+while nothing is selected, then latency from a new selection to
+selectionDetected. Idle CPU must stay within the watcher's budget and an
+event-driven watcher must not read at all while idle.
+"""
+import statistics
+import threading
+import time
+
+import pytest
+
+from helpers import wait
+from mousechat.watcher import SelectionSource, SelectionWatcher
+
+IDLE_S = 3.0
+SAMPLES = 20
+
+class FakeSelectionSource(SelectionSource):
+    """Selection backend driven by the test; each read burns read_cost_s of CPU."""
+    def __init__(self, events: bool, read_cost_s: float = 0.002):
+        self.text = ""
+        self.events = events
+        self.read_cost_s = read_cost_s
+        self.reads = 0
+        self._notify = None
+
+    def start(self, notify) -> bool:
+        self._notify = notify if self.events else None
+        return self.events
+
+    def stop(self):
+        self._notify = None
+
+    def read(self) -> str:
+        self.reads += 1
+        end = time.perf_counter() + self.read_cost_s
+        while time.perf_counter() < end:
+            pass
+        return self.text
+
+    def select(self, text: str):
+        """Called from a plain thread, like the WinEvent hook thread."""
+        self.text = text
+        if self._notify is not None:
+            self._notify()
+
+@pytest.mark.parametrize("events", [True, False], ids=["event", "poll"])
+def test_idle_cost_and_detection_latency(qapp, events):
+    wait(100)  # the first event-loop run pays one-off platform setup
+    source = FakeSelectionSource(events)
+    watcher = SelectionWatcher(source)
+    seen: list[float] = []
+    watcher.selectionDetected.connect(lambda _t: seen.append(time.monotonic()))
+    watcher.start()
+    try:
+        assert watcher.mode == ("event" if events else "poll")
+        reads0, cpu0, t0 = source.reads, time.process_time(), time.monotonic()
+        wait(int(IDLE_S * 1000))
+        wall = time.monotonic() - t0
+        idle_cpu = (time.process_time() - cpu0) / wall
+        idle_reads = (source.reads - reads0) / wall
+
+        latencies = []
+        for i in range(SAMPLES):
+            wait(300)  # a user pause, longer than the budget's read spacing
+            n = len(seen)
+            start = time.monotonic()
+            threading.Thread(target=source.select, args=(f"selection {i}",)).start()
+            while len(seen) == n and time.monotonic() - start < 5.0:
+                wait(5000, quit_on=watcher.selectionDetected)
+            latencies.append((seen[-1] - start) * 1000 if len(seen) > n else float("inf"))
+    finally:
+        watcher.stop()
+
+    limit_ms = (watcher.debounce_ms if events else watcher.poll_ms) + 250
+    assert idle_cpu <= watcher.cpu_budget
+    if events:
+        assert idle_reads == 0
+    assert statistics.quantiles(latencies, n=20)[-1] <= limit_ms, latencies